@@ -0,0 +1,137 @@
+import io
+import numpy as np
+import pandas as pd
+from .quality import SENTINELS
+from .parallel_csv import map_ranges, split_ranges, is_plain_csv, FALLBACK_ERRORS
+
+# Single-pass, mergeable covariance/correlation (Welford co-moments).
+# Chunks, byte ranges and files each produce a CoMoments; merging them
+# gives the same answer as one pass over everything, in O(k^2) memory.
+
+CHUNK_ROWS = 200_000          # Rows per pandas chunk when streaming
+RANGE_BLOCK_BYTES = 32 << 20  # Bytes per block when a worker walks its byte range
+
+
+class CoMoments:
+    """Running count, mean vector and co-moment matrix for k columns."""
+    def __init__(self, k):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, X):
+        """Folds in a 2-D float block (rows with any NaN must already be dropped)."""
+        if len(X) == 0: return self
+        other = CoMoments(X.shape[1])
+        other.n = len(X)
+        other.mean = X.mean(axis=0)
+        centred = X - other.mean
+        other.comoment = centred.T @ centred
+        return self.merge(other)
+
+    def merge(self, other):
+        """Chan et al. pairwise combination of two partial results."""
+        if other.n == 0: return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+        return self
+
+    def covariance(self):
+        return self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+
+    def correlation(self):
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / np.outer(std, std)
+
+    def as_dict(self):
+        def clean(a):
+            # JSON has no NaN: constant columns get null correlations
+            return [[round(float(v), 6) if np.isfinite(v) else None for v in row] for row in np.atleast_2d(a)]
+        return {
+            "count": int(self.n),
+            "mean": clean(self.mean)[0],
+            "covariance": clean(self.covariance()),
+            "correlation": clean(self.correlation()),
+        }
+
+
+class GroupedCoMoments:
+    """CoMoments overall and, optionally, per value of a category column."""
+    def __init__(self, columns, group_col=None):
+        self.columns = list(columns)
+        self.group_col = group_col
+        self.total = CoMoments(len(self.columns))
+        self.groups = {}
+
+    def update(self, df):
+        X = df[self.columns].apply(pd.to_numeric, errors='coerce')
+        X = X.mask(X.isin(SENTINELS))
+        complete = X.notna().all(axis=1).to_numpy()   # Listwise deletion
+        values = X.to_numpy(dtype='float64')[complete]
+        self.total.update(values)
+        if self.group_col:
+            keys = df[self.group_col].astype(str).to_numpy()[complete]
+            for key, idx in pd.Series(np.arange(len(keys))).groupby(keys).indices.items():
+                self.groups.setdefault(key, CoMoments(len(self.columns))).update(values[idx])
+        return self
+
+    def merge(self, other):
+        self.total.merge(other.total)
+        for key, part in other.groups.items():
+            self.groups.setdefault(key, CoMoments(len(self.columns))).merge(part)
+        return self
+
+    def as_dict(self):
+        result = {"columns": self.columns, **self.total.as_dict()}
+        if self.group_col:
+            result["group_by"] = self.group_col
+            result["groups"] = {k: g.as_dict() for k, g in sorted(self.groups.items())}
+        return result
+
+
+def comoments_range(path, start, end, header, columns, group_col):
+    """Worker: streams one byte range in blocks and returns its partial co-moments."""
+    acc = GroupedCoMoments(columns, group_col)
+    usecols = columns + ([group_col] if group_col else [])
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            block = f.read(min(RANGE_BLOCK_BYTES, end - f.tell()))
+            if f.tell() < end: block += f.readline()  # Finish the current line
+            acc.update(pd.read_csv(io.BytesIO(block), header=None, names=header, usecols=usecols))
+    return acc
+
+
+def correlate_stream(src, columns, group_col=None):
+    """Single-process pass over a CSV path/file in CHUNK_ROWS pieces."""
+    acc = GroupedCoMoments(columns, group_col)
+    usecols = columns + ([group_col] if group_col else [])
+    for chunk in pd.read_csv(src, usecols=usecols, chunksize=CHUNK_ROWS):
+        acc.update(chunk)
+    return acc
+
+
+def correlate_parallel(path, columns, group_col, workers):
+    """
+    Byte-range split across the shared process pool, then merged.
+    Returns None for quoted files or unparseable ranges (use correlate_stream).
+    """
+    if not is_plain_csv(path): return None
+    header = list(pd.read_csv(path, nrows=0).columns)
+    acc = GroupedCoMoments(columns, group_col)
+    jobs = [(path, a, b, header, columns, group_col) for a, b in split_ranges(path, workers)]
+    if not jobs: return acc
+    try:
+        for part in map_ranges(workers, comoments_range, jobs):
+            acc.merge(part)
+    except FALLBACK_ERRORS:
+        return None
+    return acc
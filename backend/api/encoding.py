@@ -0,0 +1,77 @@
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+# Optional fast paths; the API still works with just the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+def dumps(data):
+    """JSON bytes, via orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+# --- Tabular parts of a response, as {column: values} for Arrow ---
+def metrics_table(data):
+    return {
+        "label": [m["label"] for m in data["metrics"]],
+        "value": [m["mean"] for m in data["metrics"]],
+    }
+
+def json_metrics(metrics):
+    """JSON keeps the display strings only (raw means can be NaN, which JSON can't carry)."""
+    return [{k: v for k, v in m.items() if k != "mean"} for m in metrics]
+
+def correlation_table(data):
+    table = {"column": data["columns"], "mean": data["mean"]}
+    for i, col in enumerate(data["columns"]):
+        table[col] = [row[i] for row in data["correlation"]]
+    return table
+
+# Response key -> builder; the first key present becomes the Arrow table
+TABLES = {"metrics": metrics_table, "correlation": correlation_table}
+
+
+def wants_arrow(request):
+    return pa is not None and ARROW_TYPE in request.headers.get('Accept', '')
+
+def to_arrow(data, key):
+    """
+    One Arrow IPC stream: the table in the body, everything else as JSON
+    in the schema metadata under b'meta'.
+    """
+    table = pa.table(TABLES[key](data))
+    meta = {k: v for k, v in data.items() if k != key}
+    table = table.replace_schema_metadata({b'table': key.encode(), b'meta': dumps(meta)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def api_response(request, data, status=200):
+    """
+    Content-negotiated response: Arrow IPC when the client asks for it and
+    the payload has a table, otherwise JSON. Compression is left to
+    CompressionMiddleware.
+    """
+    key = next((k for k in TABLES if k in data), None)
+    if key and wants_arrow(request):
+        response = HttpResponse(to_arrow(data, key), content_type=ARROW_TYPE, status=status)
+    else:
+        if "metrics" in data: data = dict(data, metrics=json_metrics(data["metrics"]))
+        response = HttpResponse(dumps(data), content_type='application/json', status=status)
+    patch_vary_headers(response, ['Accept'])
+    return response
@@ -0,0 +1,228 @@
+import pandas as pd
+import numpy as np
+import io
+import os
+from . import parallel_csv
+from . import correlation
+from .quality import QualityReport, COERCE_PROBE_ROWS, coerce_candidates
+
+# The analysis engine behind /api/upload/ and /api/correlation/.
+# No Django imports: the desktop client runs this same module locally.
+
+# CSVs smaller than this use a single pd.read_csv even when workers > 1
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Text columns with at most this share of distinct values get dictionary-encoded
+CATEGORY_MAX_RATIO = 0.5
+
+def encode_categoricals(df):
+    """
+    Replaces low-cardinality text columns (Type, Status, location...) with
+    pandas Categoricals: small int codes plus one shared dictionary,
+    instead of a Python string object per cell.
+    """
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if df[col].nunique() <= CATEGORY_MAX_RATIO * len(df):
+            df[col] = df[col].astype('category')
+    return df
+
+def category_dtypes(sample):
+    """
+    dtype= for pd.read_csv that parses low-cardinality text columns straight
+    into Categoricals, picked from a probe of the first rows. Columns that
+    might be numbers with junk in them are left for the quality stage.
+    """
+    candidates = set(coerce_candidates(sample))
+    text = sample.select_dtypes(include=['object', 'string']).columns
+    return {col: 'category' for col in text
+            if col not in candidates and sample[col].nunique() <= CATEGORY_MAX_RATIO * len(sample)}
+
+def read_csv_encoded(file_obj):
+    """pd.read_csv with category_dtypes applied from the start of parsing."""
+    dtypes = category_dtypes(pd.read_csv(file_obj, nrows=COERCE_PROBE_ROWS))
+    if hasattr(file_obj, 'seek'): file_obj.seek(0)
+    df = pd.read_csv(file_obj, dtype=dtypes)
+    for col in dtypes:
+        # The probe can be fooled (repeats up top, unique values later)
+        if len(df[col].cat.categories) > CATEGORY_MAX_RATIO * len(df):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+def top_categories(series, n=5):
+    """Same as value_counts().head(n), but counts the integer codes with np.bincount."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        # Stable sort keeps ties in first-appearance order (matches the parallel merge)
+        return series.value_counts(sort=False).sort_values(ascending=False, kind='stable').head(n).to_dict()
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    top = np.argsort(-counts, kind='stable')[:n]
+    return {series.cat.categories[i]: int(counts[i]) for i in top if counts[i] > 0}
+
+def top_merged_counts(counts, total, n=5):
+    """top_categories for counts merged from chunks (dict in first-appearance order)."""
+    items = list(counts.items())
+    if len(items) <= CATEGORY_MAX_RATIO * total:
+        # Would have been a Categorical -> ties broken by sorted category order
+        items.sort(key=lambda kv: kv[0])
+    items.sort(key=lambda kv: -kv[1])
+    return {k: int(v) for k, v in items[:n]}
+
+def memory_report(before, after):
+    """Bytes per column before/after encoding (debug mode only)."""
+    report = {col: {"before": int(before[col]), "after": int(after[col])} for col in before.index}
+    report["total"] = {"before": int(before.sum()), "after": int(after.sum())}
+    return report
+
+# Priority search for "Type", "Name", "Equipment"
+PRIORITY_KEYS = ['type', 'equipment', 'category', 'machine', 'name', 'status']
+
+def rank_chart_columns(columns):
+    """
+    Orders columns by how good a pie-chart category they make: priority
+    keyword matches first, then the rest in file order. The chart uses
+    the first text column in this ranking.
+    """
+    ranked = [col for key in PRIORITY_KEYS for col in columns if key in col.lower()]
+    return list(dict.fromkeys(ranked + list(columns)))
+
+def build_metrics(means):
+    """Stat-box entries from {column: average}."""
+    metrics = []
+    for col, avg_val in means.items():
+        # Skip ID columns or empty ones
+        if 'id' in col.lower() or 'index' in col.lower():
+            continue
+
+        # Clean up label (e.g., "avg_temp_c" -> "Temp C")
+        label = col.replace('_', ' ').title()
+        # 'value' is the display string; 'mean' keeps full precision (binary responses use it)
+        metrics.append({"label": label, "value": f"{avg_val:.1f}", "mean": float(avg_val)})
+    return metrics
+
+def csv_path(file_obj):
+    """On-disk path of a CSV upload, if it has one (small uploads live in memory)."""
+    if isinstance(file_obj, (str, os.PathLike)): return os.fspath(file_obj)
+    if hasattr(file_obj, 'temporary_file_path'): return file_obj.temporary_file_path()
+    return None
+
+def process_dataset_parallel(path, workers):
+    """Byte-range parallel version of process_dataset for large unquoted CSVs (None = fall back)."""
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    merged = parallel_csv.aggregate_csv(path, workers, rank_chart_columns(columns))
+    if merged is None: return None
+    return {
+        "total_count": merged["rows"],
+        "metrics": build_metrics(merged["means"]),
+        "chart_data": (top_merged_counts(merged["counts"], merged["rows"]) if merged["chart_col"]
+                       else {"Unknown": merged["rows"]}),
+        "quality": merged["quality"].as_dict(),
+    }
+
+def process_dataset(file_obj, filename, debug=False, workers=1, parallel_min_bytes=PARALLEL_MIN_BYTES):
+    """
+    Dynamic Parser:
+    1. Finds a 'Text' column for the Pie Chart.
+    2. Finds ALL 'Numeric' columns for the Stat Boxes.
+    With debug=True the response also carries a per-column memory report.
+    CSVs on disk of at least `parallel_min_bytes` are parsed on `workers` processes.
+    """
+    try:
+        # --- 1. READ FILE ---
+        df = None
+        name = filename.lower()
+        path = csv_path(file_obj) if name.endswith('.csv') else None
+        if path and workers > 1 and not debug and os.path.getsize(path) >= parallel_min_bytes:
+            response = process_dataset_parallel(path, workers)
+            if response is not None: return response
+
+        # Debug parses plain objects so the memory report can show the saving
+        if name.endswith('.csv'): df = pd.read_csv(file_obj) if debug else read_csv_encoded(file_obj)
+        elif name.endswith(('.xls', '.xlsx')): df = pd.read_excel(file_obj)
+        elif name.endswith('.json'): df = pd.read_json(file_obj)
+        else: return {"error": "Unsupported format"}
+
+        if debug: mem_before = df.memory_usage(deep=True, index=False)
+
+        # Validate & clean (coercion, sentinels, range rules, duplicates)
+        quality = QualityReport()
+        quality.check(df)
+
+        # Dictionary-encode any text columns not already parsed as categories
+        encode_categoricals(df)
+
+        response = {
+            "total_count": int(len(df)),
+            "metrics": [],         # List for Stat Boxes
+            "chart_data": {},      # Data for Pie Chart
+            "quality": quality.as_dict()
+        }
+
+        # --- 2. DYNAMIC STATS (Find ALL Numeric Columns) ---
+        # Select columns that are numbers (float/int) and average them
+        numeric_cols = df.select_dtypes(include=['number']).columns
+        response['metrics'] = build_metrics({col: df[col].mean() for col in numeric_cols})
+
+        # --- 3. DYNAMIC CHART (Find Best Text Column) ---
+        # Look for a column that describes the 'Category' or 'Item'
+        text_cols = set(df.select_dtypes(include=['category', 'object', 'string']).columns)
+        chart_col = next((col for col in rank_chart_columns(df.columns) if col in text_cols), None)
+
+        if chart_col:
+            # Top 5 categories
+            response['chart_data'] = top_categories(df[chart_col])
+        else:
+            response['chart_data'] = {"Unknown": len(df)}
+
+        if debug:
+            response['debug'] = {"memory": memory_report(mem_before, df.memory_usage(deep=True, index=False))}
+
+        return response
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"total_count": 0, "metrics": [], "chart_data": {}, "error": str(e)}
+
+def correlation_columns(sample):
+    """Numeric telemetry columns worth correlating (ID-like columns skipped)."""
+    numeric = sample.select_dtypes(include=['number']).columns
+    return [col for col in numeric if not col.lower().endswith('id') and 'index' not in col.lower()]
+
+def correlate_dataset(file_obj, filename, columns=None, group_by=None, workers=1,
+                      parallel_min_bytes=PARALLEL_MIN_BYTES):
+    """
+    Covariance/correlation matrix of the numeric columns, optionally per category.
+    group_by: a column name, 'auto' (the pie-chart column) or None.
+    CSVs are streamed in chunks (or split across `workers` processes when large),
+    so memory stays bounded however many rows there are.
+    """
+    try:
+        name = filename.lower()
+        is_csv = name.endswith('.csv')
+        if is_csv: sample = pd.read_csv(file_obj, nrows=1000)
+        elif name.endswith(('.xls', '.xlsx')): sample = pd.read_excel(file_obj)
+        elif name.endswith('.json'): sample = pd.read_json(file_obj)
+        else: return {"error": "Unsupported format"}
+        if hasattr(file_obj, 'seek'): file_obj.seek(0)
+
+        columns = columns or correlation_columns(sample)
+        missing = [c for c in columns if c not in sample.columns]
+        if missing: return {"error": f"Unknown columns: {', '.join(missing)}"}
+        if len(columns) < 2: return {"error": "Need at least two numeric columns"}
+
+        if group_by == 'auto':
+            text_cols = set(sample.select_dtypes(include=['object', 'string', 'category']).columns)
+            group_by = next((c for c in rank_chart_columns(sample.columns) if c in text_cols), None)
+        elif group_by and group_by not in sample.columns:
+            return {"error": f"Unknown column: {group_by}"}
+
+        if not is_csv:
+            return correlation.GroupedCoMoments(columns, group_by).update(sample).as_dict()
+        path = csv_path(file_obj)
+        if path and workers > 1 and os.path.getsize(path) >= parallel_min_bytes:
+            acc = correlation.correlate_parallel(path, columns, group_by, workers)
+            if acc is not None: return acc.as_dict()
+        return correlation.correlate_stream(path or file_obj, columns, group_by).as_dict()
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"error": str(e)}
@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from settings.
+    Stored hashes keep the standard 'pbkdf2_sha256$<iterations>$...' format,
+    so changing PASSWORD_PBKDF2_ITERATIONS re-hashes users on their next login.
+    """
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
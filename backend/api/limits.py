@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: fall back to a per-process cap
+    fcntl = None
+
+class ParseSlots:
+    """
+    Node-wide cap on concurrent dataset parses.
+    Each slot is a lock file held with flock, so every server worker
+    process on the machine shares the same N slots; the OS drops the
+    lock if a worker dies mid-parse.
+    """
+    def __init__(self, slots, lock_dir):
+        self.slots = slots
+        self.lock_dir = lock_dir
+        self._local = threading.BoundedSemaphore(slots)
+
+    def try_acquire(self):
+        """Returns a slot handle, or None if the node is saturated."""
+        if fcntl is None:
+            return self._local if self._local.acquire(blocking=False) else None
+        os.makedirs(self.lock_dir, exist_ok=True)
+        for i in range(self.slots):
+            f = open(os.path.join(self.lock_dir, f'slot-{i}.lock'), 'a')
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return f
+            except BlockingIOError:
+                f.close()
+        return None
+
+    async def acquire(self, wait):
+        """Polls for a free slot for up to `wait` seconds (backpressure), then gives up."""
+        deadline = time.monotonic() + wait
+        while True:
+            slot = self.try_acquire()
+            if slot is not None or time.monotonic() >= deadline:
+                return slot
+            await asyncio.sleep(0.05)
+
+    def release(self, slot):
+        if slot is self._local:
+            self._local.release()
+        else:
+            fcntl.flock(slot, fcntl.LOCK_UN)
+            slot.close()
+
+
+class UploadGuard:
+    """
+    ASGI middleware for the upload endpoints. Django's ASGI handler reads the
+    whole body before any view runs, so the size limit is enforced here:
+    Content-Length is checked up front and body bytes are counted as they
+    arrive. Uploads still being received are capped separately (and more
+    loosely) than parses, so slow clients can't use up the parse slots;
+    those are only taken by the view, around the actual parse.
+    """
+    def __init__(self, app, paths, max_bytes, max_in_flight, retry_after):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or scope['path'] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        length = dict(scope['headers']).get(b'content-length', b'')
+        if length.isdigit() and int(length) > self.max_bytes:
+            return await self.reject(send, 413, "File too large")
+        if self.in_flight >= self.max_in_flight:
+            return await self.reject(send, 503, "Server busy, please retry",
+                                     [(b'retry-after', str(self.retry_after).encode())])
+
+        received = 0
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    # Answer now and tell Django the client went away, so it stops reading
+                    await self.reject(send, 413, "File too large")
+                    return {'type': 'http.disconnect'}
+            return message
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, limited_receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    async def reject(send, status, error, headers=()):
+        body = json.dumps({"error": error}).encode()
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'connection', b'close'),
+            *headers,
+        ]})
+        await send({'type': 'http.response.body', 'body': body})
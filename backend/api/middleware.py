@@ -0,0 +1,61 @@
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header; 'gzip;q=0' means gzip is refused."""
+    prefs = {}
+    for part in header.split(','):
+        coding, *params = [p.strip() for p in part.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding: prefs[coding.lower()] = q
+    return prefs
+
+def choose_encoding(header):
+    """Best coding we can produce for this header, or None (brotli wins ties)."""
+    prefs = accepted_encodings(header)
+    offered = (['br'] if brotli is not None else []) + ['gzip']
+    scored = [(prefs.get(c, prefs.get('*', 0.0)), c) for c in offered]
+    q, coding = max(scored, key=lambda s: s[0])  # max keeps the first of equal scores
+    return coding if q > 0 else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli (if installed) or gzip for responses of at least COMPRESS_MIN_BYTES.
+    Small bodies and streams (the SSE feed) are sent as-is.
+    """
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.COMPRESS_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ['Accept-Encoding'])
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding == 'br':
+            body = brotli.compress(response.content, quality=settings.COMPRESS_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            body = gzip.compress(response.content, compresslevel=settings.COMPRESS_GZIP_LEVEL)
+        else:
+            return response
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,147 @@
+import io
+import mmap
+import os
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+from .quality import QualityReport, COERCE_PROBE_ROWS, coerce_candidates
+
+# Parallel CSV aggregation by byte-range splitting.
+# Kept free of Django imports so the spawned worker processes stay light.
+
+_pools = {}
+
+def get_pool(workers):
+    """One long-lived process pool per worker count ('spawn' is safe from threaded servers)."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return pool
+
+def is_plain_csv(path):
+    """
+    True if the file has no quote characters at all. Quoted fields may hold
+    newlines, which byte-range splitting would cut in half, so quoted files
+    take the single-reader path. (mmap.find scans at memchr speed.)
+    """
+    if os.path.getsize(path) == 0: return True
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.find(b'"') == -1
+
+def map_ranges(workers, fn, jobs):
+    """
+    Runs fn over the job tuples on the shared pool. If a worker died (e.g.
+    OOM-killed) the pool is dropped, so the next call starts a fresh one.
+    """
+    pool = get_pool(workers)
+    try:
+        return list(pool.map(fn, *zip(*jobs)))
+    except BrokenProcessPool:
+        if _pools.get(workers) is pool: del _pools[workers]
+        pool.shutdown(wait=False)
+        raise
+
+# Errors that mean "use the single reader instead": a worker hit something
+# the single reader handles, or the pool broke
+FALLBACK_ERRORS = (pd.errors.ParserError, UnicodeDecodeError, BrokenProcessPool)
+
+def split_ranges(path, parts):
+    """Splits the body of a CSV (everything after the header) into newline-aligned byte ranges."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()  # Skip header
+        bounds = [f.tell()]
+        step = max((size - bounds[0]) // parts, 1)
+        for i in range(1, parts):
+            f.seek(bounds[0] + i * step)
+            f.readline()  # Move to the start of the next full line
+            pos = f.tell()
+            if pos >= size: break
+            if pos > bounds[-1]: bounds.append(pos)
+        bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def column_kind(series):
+    """Same buckets process_dataset uses: 'number' (stat boxes), 'text' (charts) or 'other'."""
+    if is_numeric_dtype(series) and not is_bool_dtype(series): return 'number'
+    if series.dtype == object or pd.api.types.is_string_dtype(series): return 'text'
+    return 'other'
+
+def aggregate_range(path, start, end, columns, ranked, coerce, as_text):
+    """
+    Worker: parses one byte range and reduces it to partial aggregates.
+    `coerce` and `as_text` carry the file-wide column types, so every chunk
+    cleans the same way a single pass would. Only the best-ranked text
+    column's counts are returned, since that is the only one the chart can
+    end up using.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype={col: str for col in as_text})
+    quality = QualityReport()
+    quality.check(df, coerce)
+
+    kinds = {col: column_kind(df[col]) for col in columns}
+    sums = {col: (float(df[col].sum()), int(df[col].count())) for col in columns if kinds[col] == 'number'}
+    chart_col = next((col for col in ranked if kinds[col] == 'text'), None)
+    counts = df[chart_col].value_counts(sort=False).to_dict() if chart_col else {}
+    return {"rows": len(df), "kinds": kinds, "sums": sums, "chart_col": chart_col, "counts": counts,
+            "quality": quality}
+
+def aggregate_csv(path, workers, ranked):
+    """
+    Parses a plain CSV (no quotes) on `workers` processes and merges the
+    partials. Returns None when the file is quoted, a worker can't parse its
+    range, or the chunks disagree on the chart column's type; the caller
+    should then fall back to a single pd.read_csv.
+    """
+    if not is_plain_csv(path): return None
+    sample = pd.read_csv(path, nrows=COERCE_PROBE_ROWS)
+    columns = list(sample.columns)
+    ranges = split_ranges(path, workers)
+    if not ranges: return None
+    def run(coerce):
+        # Columns that stay text are read as strings everywhere, like the single reader
+        as_text = [col for col in columns if col not in coerce and not is_bool_dtype(sample[col])]
+        jobs = [(path, a, b, columns, ranked, coerce, as_text) for a, b in ranges]
+        parts = map_ranges(workers, aggregate_range, jobs)
+        quality = QualityReport()
+        for p in parts: quality.merge(p["quality"])
+        return parts, quality
+
+    try:
+        # Optimistically coerce every candidate; coercion is then decided on the
+        # merged counts, and only a candidate that turns out to be text costs a second pass
+        candidates = coerce_candidates(sample)
+        parts, quality = run(candidates)
+        decided = set(quality.coercible())
+        # Columns with no values at all stay numeric, as in the single reader
+        coerce = [col for col in candidates if col in decided or quality.parsed[col][1] == 0]
+        if coerce != candidates: parts, quality = run(coerce)
+    except FALLBACK_ERRORS:
+        return None
+
+    merged = {"rows": sum(p["rows"] for p in parts), "kinds": {}, "means": {}, "counts": {}, "chart_col": None,
+              "quality": quality}
+    for col in columns:
+        kinds = {p["kinds"][col] for p in parts}
+        # A column is only numeric if every chunk parsed it as numeric
+        merged["kinds"][col] = kinds.pop() if len(kinds) == 1 else 'text'
+        if merged["kinds"][col] == 'number':
+            total = sum(p["sums"][col][0] for p in parts)
+            count = sum(p["sums"][col][1] for p in parts)
+            merged["means"][col] = total / count if count else float('nan')
+
+    chart_col = next((col for col in ranked if merged["kinds"][col] == 'text'), None)
+    if chart_col:
+        if any(p["chart_col"] != chart_col for p in parts): return None
+        # Chunks are merged in file order, so first-appearance order is kept
+        for p in parts:
+            for key, n in p["counts"].items():
+                merged["counts"][key] = merged["counts"].get(key, 0) + n
+    merged["chart_col"] = chart_col
+    return merged
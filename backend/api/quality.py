@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+from pandas.util import hash_pandas_object
+
+# Data-quality stage that runs before aggregation.
+# Everything is column-wise (no per-row Python loop) and the report is
+# mergeable, so it works the same on a whole file, on byte-range chunks
+# in the parallel parser, or on a stream of chunks.
+
+# Values sensor exports use for "no reading"
+SENTINELS = [-999, -9999]
+
+# Text columns where at least this share of values (over the whole file) parse as numbers are coerced
+COERCE_MIN_RATIO = 0.9
+# Probe of the first rows: columns where under half parse are plain text and never considered
+COERCE_PROBE_ROWS = 1000
+PROBE_MIN_RATIO = 0.5
+
+# Physical bands per equipment type (same as generate_data.py)
+RANGE_RULES = {
+    'Reactor':        {'temperature': (150, 350), 'pressure': (10, 50),  'flowrate': (50, 150)},
+    'Separator':      {'temperature': (50, 150),  'pressure': (5, 20),   'flowrate': (100, 300)},
+    'Pump':           {'temperature': (20, 80),   'pressure': (50, 150), 'flowrate': (200, 500)},
+    'Heat Exchanger': {'temperature': (80, 250),  'pressure': (10, 40),  'flowrate': (100, 400)},
+}
+# Column-name fragments -> measurement in RANGE_RULES
+MEASUREMENTS = {'temp': 'temperature', 'press': 'pressure', 'flow': 'flowrate'}
+
+
+def coerce_candidates(sample):
+    """
+    Columns of a head sample (first COERCE_PROBE_ROWS rows) that may be numeric.
+    Only a cheap filter: whether they are coerced is decided over the whole file.
+    """
+    candidates = []
+    for col in sample.columns:
+        s = sample[col]
+        if is_bool_dtype(s): continue
+        if not is_numeric_dtype(s):
+            probe = s.dropna()
+            if not probe.empty and pd.to_numeric(probe, errors='coerce').notna().mean() < PROBE_MIN_RATIO: continue
+        candidates.append(col)
+    return candidates
+
+
+class QualityReport:
+    """
+    Mergeable data-quality counters.
+    check() cleans a chunk in place and records what it found;
+    merge() folds in a report from another chunk or worker.
+    """
+    COUNTERS = ['missing', 'coerced', 'sentinels', 'out_of_range']
+
+    def __init__(self):
+        self.rows = 0
+        self.counts = {k: {} for k in self.COUNTERS}
+        self.parsed = {}   # Candidate column -> [values parsed as numbers, values present]
+        self.hashes = []   # Unique row hashes per chunk, for cross-chunk duplicates
+
+    def _add(self, kind, col, n):
+        if n: self.counts[kind][col] = self.counts[kind].get(col, 0) + int(n)
+
+    def coercible(self):
+        """Candidate columns that meet COERCE_MIN_RATIO over everything checked so far."""
+        # present == 0 (empty file or all-missing column) gives no evidence either way
+        return [col for col, (parsed, present) in self.parsed.items()
+                if present and parsed >= COERCE_MIN_RATIO * present]
+
+    def check(self, df, coerce=None):
+        """
+        Cleans df in place. `coerce` lists the columns to convert to numbers;
+        by default it is decided from df itself (a whole file in one pass).
+        Chunks of a bigger file are given the file-wide decision instead.
+        """
+        self.rows += len(df)
+
+        # 1. Coerce text columns that are really numbers with some junk in them
+        decide = coerce is None
+        if decide: coerce = coerce_candidates(df.head(COERCE_PROBE_ROWS))
+        converted = {}
+        for col in coerce:
+            s = df[col]
+            nums = s if is_numeric_dtype(s) else pd.to_numeric(s, errors='coerce')
+            tally = self.parsed.setdefault(col, [0, 0])
+            tally[0] += int(nums.notna().sum())
+            tally[1] += int(s.notna().sum())
+            converted[col] = nums
+        if decide: coerce = [col for col in self.coercible() if col in converted]
+        for col in coerce:
+            nums = converted[col]
+            if nums is df[col]: continue
+            self._add('coerced', col, (df[col].notna() & nums.isna()).sum())
+            df[col] = nums
+
+        # 2. Sentinels -> NaN
+        numeric_cols = [c for c in df.columns if is_numeric_dtype(df[c]) and not is_bool_dtype(df[c])]
+        for col in numeric_cols:
+            mask = df[col].isin(SENTINELS)
+            if mask.any():
+                self._add('sentinels', col, mask.sum())
+                df[col] = df[col].mask(mask)
+
+        # 3. Range rules per equipment type (flagged, not removed: they may be real anomalies)
+        type_col = next((c for c in df.columns if 'type' in c.lower() and c not in numeric_cols), None)
+        if type_col is not None:
+            # Integer code per row (a Categorical's own codes, else one factorize);
+            # bounds are then per-type arrays indexed by code. Code -1 (missing)
+            # and unknown types get NaN bounds, which never flag.
+            types = df[type_col]
+            if isinstance(types.dtype, pd.CategoricalDtype):
+                codes, uniques = types.cat.codes.to_numpy(), types.cat.categories
+            else:
+                codes, uniques = pd.factorize(types)
+            for col in numeric_cols:
+                key = next((m for frag, m in MEASUREMENTS.items() if frag in col.lower()), None)
+                if key is None: continue
+                bounds = np.array([RANGE_RULES[t][key] if t in RANGE_RULES else (np.nan, np.nan) for t in uniques]
+                                  + [(np.nan, np.nan)], dtype='float64').reshape(-1, 2)
+                vals = df[col].to_numpy(dtype='float64', na_value=np.nan)
+                with np.errstate(invalid='ignore'):
+                    out = (vals < bounds[codes, 0]) | (vals > bounds[codes, 1])
+                self._add('out_of_range', col, out.sum())
+
+        # 4. Missing values (after cleaning)
+        for col, n in df.isna().sum().items(): self._add('missing', col, n)
+
+        # 5. Row hashes; numbers hashed as float64 so int/float chunks agree
+        hashed = df.astype({c: 'float64' for c in numeric_cols})
+        self.hashes.append(np.unique(hash_pandas_object(hashed, index=False).to_numpy()))
+        return df
+
+    def merge(self, other):
+        self.rows += other.rows
+        for kind in self.COUNTERS:
+            for col, n in other.counts[kind].items(): self._add(kind, col, n)
+        for col, (parsed, present) in other.parsed.items():
+            tally = self.parsed.setdefault(col, [0, 0])
+            tally[0] += parsed
+            tally[1] += present
+        self.hashes.extend(other.hashes)
+        return self
+
+    def duplicate_rows(self):
+        if not self.hashes: return 0
+        # Fold to one array so memory stays at one hash per distinct row
+        unique = np.unique(np.concatenate(self.hashes))
+        self.hashes = [unique]
+        return self.rows - len(unique)
+
+    def as_dict(self):
+        report = {"rows": self.rows, "duplicate_rows": int(self.duplicate_rows())}
+        report.update(self.counts)
+        return report
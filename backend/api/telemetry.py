@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections import deque, Counter, OrderedDict
+from django.conf import settings
+from .encoding import dumps
+
+# Columns of equipment_anomaly_data.csv
+KEY_FIELD = 'equipment'
+NUMERIC_FIELDS = ['temperature', 'pressure', 'vibration', 'humidity']
+CATEGORY_FIELDS = ['location', 'faulty']
+
+
+class RollingStats:
+    """
+    Ring buffer with a windowed mean/variance.
+    Every push is O(1): the evicted value is swapped out of the
+    running mean and M2 (Welford's update, with removal).
+    """
+    def __init__(self, size):
+        self.size = size
+        self.buf = [0.0] * size
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x):
+        if self.count < self.size:
+            # Window still filling up -> plain Welford step
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Window full -> replace the oldest value in place
+            old = self.buf[self.pos]
+            old_mean = self.mean
+            self.mean += (x - old) / self.count
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            if self.m2 < 0: self.m2 = 0.0
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+
+    def summary(self):
+        var = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        return {"count": self.count, "mean": round(self.mean, 3), "std": round(var ** 0.5, 3)}
+
+
+class EquipmentWindow:
+    """Rolling aggregates for one piece of equipment."""
+    def __init__(self, size):
+        self.size = size
+        self.stats = {f: RollingStats(size) for f in NUMERIC_FIELDS}
+        self.labels = deque(maxlen=size)   # Ring of category tuples
+        self.counts = {f: Counter() for f in CATEGORY_FIELDS}
+
+    def push(self, reading):
+        for f in NUMERIC_FIELDS:
+            try:
+                val = float(reading[f])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if val == val:  # Skip NaN
+                self.stats[f].push(val)
+
+        # Evict the oldest categories before the deque drops them
+        if len(self.labels) == self.size:
+            for f, old in zip(CATEGORY_FIELDS, self.labels[0]):
+                c = self.counts[f]
+                c[old] -= 1
+                if c[old] <= 0: del c[old]
+        new = tuple(str(reading.get(f, 'Unknown')) for f in CATEGORY_FIELDS)
+        self.labels.append(new)
+        for f, val in zip(CATEGORY_FIELDS, new):
+            self.counts[f][val] += 1
+
+    def summary(self):
+        return {
+            "metrics": {f: s.summary() for f, s in self.stats.items() if s.count},
+            "categories": {f: dict(c) for f, c in self.counts.items()},
+        }
+
+
+class TelemetryHub:
+    """
+    Holds the live windows and fans out updates to SSE subscribers.
+    Each subscriber only owns an Event, so bursts of readings coalesce
+    into one push, and pushes are spaced at least `interval` apart.
+    A subscriber gets one full snapshot, then deltas with only the
+    equipment changed since its last push; each event is encoded once
+    per version and shared by every subscriber at the same version.
+    At most `max_equipment` windows are kept: when full, the least recently
+    updated one is evicted if it has been idle for `idle_evict` seconds,
+    otherwise readings for new equipment are rejected.
+    """
+    def __init__(self, window=256, interval=0.5, keepalive=15, max_equipment=1000, idle_evict=300):
+        self.window = window
+        self.interval = interval
+        self.keepalive = keepalive
+        self.max_equipment = max_equipment
+        self.idle_evict = idle_evict
+        self.windows = OrderedDict()   # Least recently updated first
+        self.last_seen = {}
+        self.changed = {}       # Equipment -> version of its last update
+        self.reset_version = 0  # Last eviction; older subscribers need a full snapshot
+        self.version = 0
+        self.subscribers = set()
+        self._events = {}       # since-version -> encoded event, for self._events_version
+        self._events_version = -1
+
+    def ingest(self, readings):
+        accepted = 0
+        version = self.version + 1
+        for r in readings:
+            if not isinstance(r, dict): continue
+            key = str(r.get(KEY_FIELD) or 'Unknown')
+            win = self._window(key)
+            if win is None: continue
+            win.push(r)
+            self.changed[key] = version
+            accepted += 1
+        if accepted:
+            self.version = version
+            for ev in self.subscribers: ev.set()
+        return accepted
+
+    def _window(self, key):
+        """Window for `key` (marked most recently used), or None if the hub is full."""
+        now = time.monotonic()
+        win = self.windows.get(key)
+        if win is None:
+            if len(self.windows) >= self.max_equipment:
+                oldest = next(iter(self.windows))
+                if now - self.last_seen[oldest] < self.idle_evict:
+                    return None
+                del self.windows[oldest], self.last_seen[oldest], self.changed[oldest]
+                self.reset_version = self.version + 1
+            win = self.windows[key] = EquipmentWindow(self.window)
+        else:
+            self.windows.move_to_end(key)
+        self.last_seen[key] = now
+        return win
+
+    def snapshot(self):
+        return {
+            "version": self.version,
+            "equipment": {k: w.summary() for k, w in self.windows.items()},
+        }
+
+    def event(self, since):
+        """
+        Encoded SSE event bringing a subscriber at version `since` up to date:
+        the full snapshot for new (or pre-eviction) subscribers, else a delta.
+        """
+        if self._events_version != self.version:
+            self._events, self._events_version = {}, self.version
+        if since < self.reset_version: since = 0
+        event = self._events.get(since)
+        if event is None:
+            if since == 0:
+                kind, data = 'snapshot', self.snapshot()
+            else:
+                # Windows are kept in update order, so the changed ones are at the end
+                changed = {}
+                for key in reversed(self.windows):
+                    if self.changed[key] <= since: break
+                    changed[key] = self.windows[key].summary()
+                kind, data = 'delta', {"version": self.version, "equipment": changed}
+            event = self._events[since] = f"event: {kind}\ndata: {dumps(data).decode()}\n\n"
+        return event
+
+    async def stream(self):
+        """Async generator of Server-Sent Events."""
+        ev = asyncio.Event()
+        ev.set()  # Send the current state straight away
+        self.subscribers.add(ev)
+        since = 0
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(ev.wait(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                ev.clear()
+                version = self.version
+                yield self.event(since)
+                since = version
+                await asyncio.sleep(self.interval)
+        finally:
+            self.subscribers.discard(ev)
+
+
+# One hub per server process (run the ASGI app with a single worker for live mode)
+hub = TelemetryHub(
+    window=settings.TELEMETRY_WINDOW,
+    interval=settings.TELEMETRY_PUSH_INTERVAL,
+    max_equipment=settings.TELEMETRY_MAX_EQUIPMENT,
+    idle_evict=settings.TELEMETRY_IDLE_EVICT,
+)
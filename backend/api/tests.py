@@ -1,3 +1,396 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import random
+import shutil
+import signal
+import statistics
+import tempfile
+import time
+from unittest import mock
+from asgiref.sync import async_to_sync
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, identify_hasher, make_password
+from django.test import Client, SimpleTestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.core.files.uploadedfile import SimpleUploadedFile
 
-# Create your tests here.
+from config.asgi import django_application
+from .correlation import CoMoments
+from .encoding import metrics_table
+from .limits import ParseSlots, UploadGuard
+from .middleware import choose_encoding
+from . import parallel_csv
+from .parallel_csv import split_ranges
+from .quality import QualityReport, RANGE_RULES
+from .telemetry import RollingStats, TelemetryHub
+from .utils import process_dataset, correlate_dataset
+from . import engine
+from . import views
+
+SCALE = 2000  # large_dataset.csv x 2000 = 2,000,000 rows
+
+
+@override_settings(PARALLEL_PARSE_MIN_BYTES=0)
+class ParallelParseTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'scaled.csv')
+        with open(settings.BASE_DIR.parent / 'large_dataset.csv', 'rb') as f:
+            header = f.readline()
+            body = f.read()
+        if not body.endswith(b'\n'): body += b'\n'
+        with open(cls.path, 'wb') as out:
+            out.write(header)
+            for _ in range(SCALE): out.write(body)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+        super().tearDownClass()
+
+    def test_ranges_cover_body_on_line_boundaries(self):
+        ranges = split_ranges(self.path, 7)
+        with open(self.path, 'rb') as f:
+            header_len = len(f.readline())
+            data = f.read()
+        self.assertEqual(ranges[0][0], header_len)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - header_len - 1:end - header_len], b'\n')
+
+    def test_parallel_matches_single_process(self):
+        single = process_dataset(self.path, 'scaled.csv', workers=1)
+        self.assertEqual(single['total_count'], 1000 * SCALE)
+        for workers in (2, 4):
+            self.assertEqual(process_dataset(self.path, 'scaled.csv', workers=workers), single)
+
+    def test_parallel_correlation_matches_single_process(self):
+        single = correlate_dataset(self.path, 'scaled.csv', group_by='auto', workers=1)
+        parallel = correlate_dataset(self.path, 'scaled.csv', group_by='auto', workers=3)
+        self.assertEqual((single['group_by'], single['count']), ('Type', 1000 * SCALE))
+        self.assertEqual(parallel['columns'], single['columns'])
+        self.assertEqual(sorted(parallel['groups']), sorted(single['groups']))
+        for a, b in [(parallel, single)] + [(parallel['groups'][k], single['groups'][k]) for k in single['groups']]:
+            self.assertEqual(a['count'], b['count'])
+            for key in ('mean', 'covariance', 'correlation'):
+                np.testing.assert_allclose(a[key], b[key], rtol=1e-6, atol=1e-6)
+
+    def test_high_cardinality_chart_column_matches(self):
+        # Every name unique -> ties broken by first appearance in both paths
+        path = os.path.join(self.tmp, 'names.csv')
+        with open(path, 'w') as f:
+            f.write('Name,Value\n')
+            for i in range(5000): f.write(f'unit-{(i * 7919) % 5000},{i % 13}\n')
+        self.assertEqual(process_dataset(path, 'names.csv', workers=3),
+                         process_dataset(path, 'names.csv', workers=1))
+
+    def test_quoted_multiline_fields_fall_back_to_single_reader(self):
+        path = os.path.join(self.tmp, 'quoted.csv')
+        with open(path, 'w') as f:
+            f.write('Type,Notes,Temperature,Pressure\n')
+            for i in range(4000): f.write(f'Pump,"line one\nline, two {i}",{i % 90},{i % 17}\n')
+        single = process_dataset(path, 'quoted.csv', workers=1)
+        self.assertNotIn('error', single)
+        self.assertEqual(single['total_count'], 4000)
+        self.assertEqual(process_dataset(path, 'quoted.csv', workers=4), single)
+        self.assertEqual(correlate_dataset(path, 'quoted.csv', workers=4),
+                         correlate_dataset(path, 'quoted.csv', workers=1))
+
+    def test_dirty_columns_coerced_the_same_in_parallel(self):
+        # Junk mid-file (Temperature), junk-heavy first rows (Pressure), and a
+        # column that looks numeric at the top but is text overall (Code)
+        path = os.path.join(self.tmp, 'dirty.csv')
+        types = list(RANGE_RULES)
+        with open(path, 'w') as f:
+            f.write('EquipmentID,Type,Temperature,Pressure,Code,Spare\n')
+            for i in range(40_000):
+                temp = 'ERR' if 20_000 <= i < 20_750 else 100 + i % 200
+                press = 'bad' if i < 1000 and i % 7 == 0 else -999 if i % 501 == 0 else 10 + i % 40
+                code = i if i < 1000 else f'X{i % 300}'
+                f.write(f'EQ-{i % 5000},{types[i % 4]},{temp},{press},{code},\n')
+        single = process_dataset(path, 'dirty.csv', workers=1)
+        labels = [m['label'] for m in single['metrics']]
+        self.assertIn('Temperature', labels)
+        self.assertIn('Pressure', labels)
+        self.assertNotIn('Code', labels)
+        self.assertEqual(single['quality']['coerced'], {'Temperature': 750, 'Pressure': 143})
+        for workers in (2, 4):
+            # Compared as JSON text: the all-empty Spare column's NaN mean never equals itself
+            self.assertEqual(json.dumps(process_dataset(path, 'dirty.csv', workers=workers), sort_keys=True),
+                             json.dumps(single, sort_keys=True))
+
+    def test_broken_pool_falls_back_and_is_replaced(self):
+        path = os.path.join(self.tmp, 'broken.csv')
+        with open(path, 'w') as f:
+            f.write('Type,Temperature,Pressure\n')
+            for i in range(5000): f.write(f'Pump,{i % 90},{i % 17}\n')
+        pool = parallel_csv.get_pool(2)
+        for pid in {pool.submit(os.getpid).result() for _ in range(8)}:
+            os.kill(pid, signal.SIGKILL)   # e.g. the OOM killer
+        time.sleep(0.5)
+        single = process_dataset(path, 'broken.csv', workers=1)
+        self.assertEqual(process_dataset(path, 'broken.csv', workers=2), single)   # Fell back
+        fresh = parallel_csv.get_pool(2)
+        self.assertIsNot(fresh, pool)
+        self.assertEqual(correlate_dataset(path, 'broken.csv', workers=2),
+                         correlate_dataset(path, 'broken.csv', workers=1))
+        self.assertIs(parallel_csv.get_pool(2), fresh)   # The new pool ran without breaking
+
+
+class CategoricalTests(SimpleTestCase):
+    CSV = 'ID,Type,Temp\n' + ''.join(f'U{i},{"Pump" if i % 3 else "Valve"},{i}\n' for i in range(40))
+
+    def test_low_cardinality_text_parsed_as_category(self):
+        df = engine.read_csv_encoded(io.StringIO(self.CSV))
+        self.assertIsInstance(df['Type'].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(df['ID'].dtype, pd.CategoricalDtype)   # Unique per row -> stays text
+
+    def test_encode_categoricals_respects_ratio(self):
+        df = engine.encode_categoricals(pd.read_csv(io.StringIO(self.CSV)))
+        self.assertIsInstance(df['Type'].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(df['ID'].dtype, pd.CategoricalDtype)
+
+    def test_top_categories_ties_in_category_order(self):
+        s = pd.Series(['b', 'c', 'a', 'c', 'b', 'a', 'd'])
+        self.assertEqual(list(engine.top_categories(s.astype('category'), n=3).items()),
+                         [('a', 2), ('b', 2), ('c', 2)])
+        self.assertEqual(list(engine.top_categories(s, n=3).items()),   # Plain text: first appearance
+                         [('b', 2), ('c', 2), ('a', 2)])
+
+    def test_debug_memory_report(self):
+        data = engine.process_dataset(io.StringIO(self.CSV), 'a.csv', debug=True)
+        memory = data['debug']['memory']
+        self.assertLess(memory['Type']['after'], memory['Type']['before'])
+        self.assertEqual(memory['ID']['after'], memory['ID']['before'])
+        self.assertEqual(memory['total']['before'], sum(m['before'] for c, m in memory.items() if c != 'total'))
+        self.assertEqual(data['chart_data'], engine.process_dataset(io.StringIO(self.CSV), 'a.csv')['chart_data'])
+
+
+class QualityReportTests(SimpleTestCase):
+    def test_dirty_rows_are_cleaned_and_counted(self):
+        rows = ['EQ-1,Reactor,200,20', 'EQ-2,Pump,-999,100', 'EQ-3,Pump,50,abc',
+                'EQ-4,Separator,400,10', 'EQ-1,Reactor,200,20']
+        rows += [f'EQ-{i},Reactor,210,{20 + i}' for i in range(5, 15)]
+        df = pd.read_csv(io.StringIO('EquipmentID,Type,Temperature,Pressure\n' + '\n'.join(rows)))
+        report = QualityReport()
+        report.check(df)
+        self.assertEqual(df['Pressure'].dtype.kind, 'f')
+        self.assertEqual(report.as_dict(), {
+            "rows": 15, "duplicate_rows": 1,
+            "missing": {"Temperature": 1, "Pressure": 1},
+            "coerced": {"Pressure": 1},
+            "sentinels": {"Temperature": 1},
+            "out_of_range": {"Temperature": 1},
+        })
+
+    def test_header_only_csv_has_no_metrics(self):
+        data = engine.process_dataset(io.StringIO('Type,Temp\n'), 'a.csv')
+        self.assertEqual((data['total_count'], data['metrics']), (0, []))
+
+
+class CorrelationViewTests(SimpleTestCase):
+    def post(self, query=''):
+        with open(settings.BASE_DIR.parent / 'sample_equipment_data.csv', 'rb') as f:
+            upload = SimpleUploadedFile('sample.csv', f.read())
+        return Client().post('/api/correlation/' + query, {'file': upload})
+
+    def test_selected_columns(self):
+        response = self.post('?columns=Pressure,Temperature&group_by=Type')
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['columns'], data['group_by']), (['Pressure', 'Temperature'], 'Type'))
+        self.assertEqual(np.shape(data['correlation']), (2, 2))
+        self.assertEqual(data['correlation'][0][0], 1.0)
+        self.assertEqual(sum(g['count'] for g in data['groups'].values()), data['count'])
+
+    def test_unknown_column(self):
+        self.assertEqual(self.post('?columns=Pressure,Nope').json()['error'], 'Unknown columns: Nope')
+        self.assertEqual(self.post('?group_by=Nope').json()['error'], 'Unknown column: Nope')
+
+
+class CoMomentsTests(SimpleTestCase):
+    def test_merged_chunks_match_numpy(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(10_000, 4)) @ rng.normal(size=(4, 4)) + 1e6  # Large offset tests stability
+        merged = CoMoments(4)
+        for part in np.array_split(X, 7):
+            merged.merge(CoMoments(4).update(part))
+        np.testing.assert_allclose(merged.covariance(), np.cov(X, rowvar=False), rtol=1e-9)
+        np.testing.assert_allclose(merged.correlation(), np.corrcoef(X, rowvar=False), rtol=1e-9)
+
+
+class TelemetryTests(SimpleTestCase):
+    def test_rolling_stats_match_last_n_values(self):
+        rng = random.Random(0)
+        values = [rng.gauss(500, 50) for _ in range(2000)]
+        stats = RollingStats(64)
+        for i, x in enumerate(values, 1):
+            stats.push(x)
+            window = values[max(0, i - 64):i]
+            self.assertEqual(stats.count, len(window))
+            self.assertAlmostEqual(stats.mean, statistics.fmean(window), places=9)
+            if len(window) > 1:
+                self.assertAlmostEqual((stats.m2 / (stats.count - 1)) ** 0.5, statistics.stdev(window), places=7)
+
+    def test_stream_events_are_shared_deltas(self):
+        hub = TelemetryHub(window=4, max_equipment=2, idle_evict=60)
+        hub.ingest([{'equipment': 'A', 'temperature': 1}, {'equipment': 'B', 'temperature': 2}])
+        first = hub.event(0)
+        self.assertTrue(first.startswith('event: snapshot'))
+        self.assertIs(hub.event(0), first)   # Encoded once per version
+        hub.ingest([{'equipment': 'B', 'temperature': 3}])
+        delta = json.loads(hub.event(1).split('data: ', 1)[1])
+        self.assertEqual((delta['version'], list(delta['equipment'])), (2, ['B']))
+        hub.last_seen['A'] -= 120
+        hub.ingest([{'equipment': 'C', 'temperature': 4}])   # Evicts A
+        self.assertTrue(hub.event(2).startswith('event: snapshot'))
+
+    def test_equipment_cap_evicts_idle_and_rejects_busy(self):
+        hub = TelemetryHub(window=4, max_equipment=2, idle_evict=60)
+        self.assertEqual(hub.ingest([{'equipment': 'A'}, {'equipment': 'B'}]), 2)
+        self.assertEqual(hub.ingest([{'equipment': 'C'}]), 0)   # Full, nothing idle
+        hub.last_seen['A'] -= 120
+        self.assertEqual(hub.ingest([{'equipment': 'C'}]), 1)   # A was idle -> evicted
+        self.assertEqual(list(hub.windows), ['B', 'C'])
+
+
+class PasswordStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        patcher = mock.patch.object(views, 'USER_DB_FILE', os.path.join(self.tmp, 'users.csv'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def add_user(self, password):
+        views.save_user({'name': 'Ann', 'email': 'ann@x.com', 'password': password, 'phone': '', 'institute': ''})
+
+    def stored(self):
+        return views.get_users()[0]['password']
+
+    def test_plaintext_row_upgrades_on_correct_login(self):
+        self.add_user('secret')
+        self.assertIsNone(views.verify_user('ann@x.com', 'wrong'))
+        self.assertEqual(self.stored(), 'secret')   # No upgrade on a failed login
+        self.assertEqual(views.verify_user('ann@x.com', 'secret')['name'], 'Ann')
+        self.assertEqual(identify_hasher(self.stored()).algorithm, 'pbkdf2_sha256')
+        self.assertTrue(check_password('secret', self.stored()))
+        self.assertIsNotNone(views.verify_user('ann@x.com', 'secret'))
+
+    def test_wrong_password_against_hash(self):
+        self.add_user(make_password('secret'))
+        before = self.stored()
+        self.assertIsNone(views.verify_user('ann@x.com', 'Secret'))
+        self.assertIsNone(views.verify_user('nobody@x.com', 'secret'))
+        self.assertEqual(self.stored(), before)
+
+    def test_outdated_iterations_are_rehashed(self):
+        self.add_user(PBKDF2PasswordHasher().encode('secret', 'saltsalt', iterations=1000))
+        self.assertIsNotNone(views.verify_user('ann@x.com', 'secret'))
+        iterations = int(self.stored().split('$')[1])
+        self.assertEqual(iterations, settings.PASSWORD_PBKDF2_ITERATIONS)
+        self.assertTrue(check_password('secret', self.stored()))
+
+    def test_signup_and_profile_update_store_hashes(self):
+        client = Client()
+        client.post('/api/signup/', {'name': 'Bo', 'email': 'bo@x.com', 'password': 'first'},
+                    content_type='application/json')
+        self.assertTrue(check_password('first', self.stored()))
+        client.post('/api/update-profile/', {'email': 'bo@x.com', 'password': 'second'},
+                    content_type='application/json')
+        self.assertTrue(check_password('second', self.stored()))
+        self.assertNotIn('second', self.stored())
+        self.assertEqual(client.post('/api/login/', {'email': 'bo@x.com', 'password': 'second'},
+                                     content_type='application/json').status_code, 200)
+
+
+@async_to_sync
+async def asgi_post(app, path, chunks, headers=()):
+    """POSTs `chunks` through an ASGI app; returns (status, headers, body, chunks left unread)."""
+    pending, sent = list(chunks), []
+    async def receive():
+        if not pending:
+            await asyncio.Event().wait()   # Client stays connected until the response is done
+        body = pending.pop(0)
+        return {'type': 'http.request', 'body': body, 'more_body': bool(pending)}
+    async def send(message):
+        sent.append(message)
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+             'headers': [(k.encode(), v.encode()) for k, v in headers], 'server': ('testserver', 80)}
+    await app(scope, receive, send)
+    starts = [m for m in sent if m['type'] == 'http.response.start']
+    assert len(starts) == 1, sent
+    body = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+    return starts[0]['status'], dict((k.decode().lower(), v.decode()) for k, v in starts[0]['headers']), body, len(pending)
+
+
+class UploadGuardTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.slots = ParseSlots(1, self.tmp)
+        patcher = mock.patch.object(views, 'parse_slots', self.slots)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.guard = UploadGuard(django_application, ['/api/upload/'],
+                                 max_bytes=1000, max_in_flight=2, retry_after=5)
+
+    def post_csv(self):
+        body = encode_multipart(BOUNDARY, {'file': SimpleUploadedFile('a.csv', b'Type,Temp\nPump,50\nPump,70\n')})
+        return asgi_post(self.guard, '/api/upload/', [body[:100], body[100:]],
+                         [('content-type', MULTIPART_CONTENT), ('content-length', str(len(body)))])
+
+    def test_content_length_over_limit_is_rejected_unread(self):
+        status, _, body, left = asgi_post(self.guard, '/api/upload/', [b'x' * 500] * 4,
+                                          [('content-length', '2000')])
+        self.assertEqual((status, left), (413, 4))
+        self.assertIn(b'File too large', body)
+
+    def test_streamed_body_stops_at_limit(self):
+        # No Content-Length (chunked): bytes are counted as they arrive
+        status, _, _, left = asgi_post(self.guard, '/api/upload/', [b'x' * 500] * 10)
+        self.assertEqual((status, left, self.guard.in_flight), (413, 7, 0))
+
+    def test_too_many_uploads_in_flight_shed_unread(self):
+        self.guard.in_flight = self.guard.max_in_flight
+        status, headers, _, left = asgi_post(self.guard, '/api/upload/', [b'x' * 100])
+        self.assertEqual((status, headers['retry-after'], left), (503, '5', 1))
+
+    @override_settings(PARSE_QUEUE_WAIT=0)
+    def test_parse_slot_only_taken_for_the_parse(self):
+        # A busy parser doesn't stop bodies arriving; the view sheds once it needs a slot
+        held = self.slots.try_acquire()
+        status, headers, _, left = self.post_csv()
+        self.assertEqual((status, headers['retry-after'], left), (503, '5', 0))
+        self.slots.release(held)
+        status, _, content, _ = self.post_csv()
+        self.assertEqual(status, 200, content)
+        self.assertIn(b'"total_count":2', content.replace(b' ', b''))
+        self.assertIsNotNone(self.slots.try_acquire())   # Released after the parse
+
+
+class EncodingTests(SimpleTestCase):
+    def test_arrow_metrics_keep_full_precision(self):
+        df = io.StringIO('Type,Temperature\nPump,50.04\nPump,50.01\n')
+        data = engine.process_dataset(df, 'a.csv')
+        self.assertEqual(data['metrics'][0]['value'], '50.0')
+        self.assertEqual(metrics_table(data)['value'], [(50.04 + 50.01) / 2])
+
+    def test_json_response_has_display_strings_only(self):
+        response = Client().post('/api/upload/', {'file': SimpleUploadedFile('a.csv', b'Type,Temp\nPump,50.04\n')})
+        self.assertEqual(response.json()['metrics'], [{'label': 'Temp', 'value': '50.0'}])
+
+    def test_accept_encoding_q_values(self):
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertEqual(choose_encoding('br;q=0, gzip'), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip;q=0.9'), 'gzip')
+        self.assertEqual(choose_encoding('*;q=0, gzip'), 'gzip')
@@ -0,0 +1,27 @@
+import hashlib
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler, StopUpload
+
+class SpoolingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every upload straight to a spool file on disk (never RAM),
+    hashing and counting bytes as chunks arrive. Once UPLOAD_MAX_BYTES is
+    passed the upload is aborted and request.upload_too_large is set.
+    """
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_BYTES:
+            self.request.upload_too_large = True
+            raise StopUpload(connection_reset=True)
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        f = super().file_complete(file_size)
+        f.sha256 = self.sha256.hexdigest()
+        return f
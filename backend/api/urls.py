@@ -1,9 +1,13 @@
 from django.urls import path
-from .views import UploadView, SignupView, LoginView, UpdateProfileView
+from .views import (UploadView, SignupView, LoginView, UpdateProfileView, CorrelationView,
+                    TelemetryIngestView, TelemetryStreamView)
 
 urlpatterns = [
     path('upload/', UploadView.as_view(), name='upload'),
     path('signup/', SignupView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
     path('update-profile/', UpdateProfileView.as_view(), name='update-profile'),
+    path('correlation/', CorrelationView.as_view(), name='correlation'),
+    path('telemetry/ingest/', TelemetryIngestView.as_view(), name='telemetry-ingest'),
+    path('telemetry/stream/', TelemetryStreamView.as_view(), name='telemetry-stream'),
 ]
\ No newline at end of file
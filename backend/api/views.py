@@ -1,14 +1,30 @@
 import json
 import csv
 import os
-from django.http import JsonResponse
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password, identify_hasher
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views import View
-from .utils import process_dataset  # Ensure backend/api/utils.py exists!
+from .utils import process_dataset_async, correlate_dataset_async  # Ensure backend/api/utils.py exists!
+from .limits import ParseSlots
+from .encoding import api_response
+from .telemetry import hub
 
 # File to store users
 USER_DB_FILE = 'users.csv'
+# Serialises read-modify-write cycles on the CSV across worker threads
+USER_DB_LOCK = threading.Lock()
+# Node-wide cap on concurrent parses (each one can take several x the file size in RAM)
+parse_slots = ParseSlots(settings.MAX_CONCURRENT_PARSES, settings.PARSE_SLOT_DIR)
+# Password hashing is deliberately slow, so it gets its own bounded pool
+_auth_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='auth')
 
 def get_users():
     """Helper to read users from CSV"""
@@ -30,65 +46,138 @@ def save_user(user_data):
             writer.writeheader()
         writer.writerow(user_data)
 
+def register_user(user_data):
+    """Helper to add a user unless the email is taken. Returns False on duplicate."""
+    with USER_DB_LOCK:
+        if any(u['email'] == user_data['email'] for u in get_users()):
+            return False
+        save_user(user_data)
+        return True
+
 def update_user_in_csv(updated_data):
     """Helper to update a specific user in CSV"""
-    users = get_users()
-    updated = False
-    
-    # Update the user list in memory
-    for user in users:
-        if user['email'] == updated_data['email']:
-            user.update(updated_data) # Update fields
-            updated = True
-            break
-            
-    # Write back to file if change occurred
-    if updated:
-        with open(USER_DB_FILE, mode='w', newline='') as f:
-            fieldnames = ['name', 'email', 'password', 'phone', 'institute']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(users)
-            
+    with USER_DB_LOCK:
+        users = get_users()
+        updated = False
+
+        # Update the user list in memory
+        for user in users:
+            if user['email'] == updated_data['email']:
+                user.update(updated_data) # Update fields
+                updated = True
+                break
+
+        # Write back to file if change occurred. Write a temp file and swap it
+        # in, so lock-free readers (logins) never see a half-written CSV.
+        if updated:
+            tmp = USER_DB_FILE + '.tmp'
+            with open(tmp, mode='w', newline='') as f:
+                fieldnames = ['name', 'email', 'password', 'phone', 'institute']
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(users)
+            os.replace(tmp, USER_DB_FILE)
+
     return updated
 
+def verify_user(email, password):
+    """
+    Helper to check a login against the CSV. Returns the user row or None.
+    Legacy plaintext rows and hashes with an outdated work factor are
+    re-hashed in place on a successful login.
+    """
+    user = next((u for u in get_users() if u['email'] == email), None)
+    if user is None:
+        make_password(password)  # Burn the same time so unknown emails aren't detectable
+        return None
+
+    def upgrade(raw):
+        update_user_in_csv({'email': email, 'password': make_password(raw)})
+
+    stored = user['password']
+    try:
+        identify_hasher(stored)
+    except ValueError:
+        # Legacy plaintext row
+        if not constant_time_compare(password, stored):
+            return None
+        upgrade(password)
+        return user
+    return user if check_password(password, stored, setter=upgrade) else None
+
+async def run_in_auth_pool(func, *args):
+    """Runs a hashing helper off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_auth_pool, func, *args)
+
+# Async wrappers: file access runs on a worker thread, never on the event loop
+aregister_user = sync_to_async(register_user, thread_sensitive=False)
+aupdate_user_in_csv = sync_to_async(update_user_in_csv, thread_sensitive=False)
+
+async def handle_upload(request, analyse):
+    """
+    Shared guard for endpoints that analyse an uploaded file:
+    size limit, node-wide parse slot, then `await analyse(uploaded_file)`.
+    Under ASGI, UploadGuard (config/asgi.py) has already enforced the size
+    limit while the body arrived; the slot is only held for the parse.
+    """
+    # Reject oversized uploads before reading the body (WSGI)
+    if int(request.META.get('CONTENT_LENGTH') or 0) > settings.UPLOAD_MAX_BYTES:
+        return JsonResponse({"error": "File too large"}, status=413)
+
+    # Backpressure: wait briefly for a parse slot, then shed load
+    slot = await parse_slots.acquire(settings.PARSE_QUEUE_WAIT)
+    if slot is None:
+        response = JsonResponse({"error": "Server busy, please retry"}, status=503)
+        response['Retry-After'] = str(settings.UPLOAD_RETRY_AFTER)
+        return response
+
+    try:
+        # Multipart parsing spools the file to disk, so keep it off the event loop
+        files = await sync_to_async(lambda: request.FILES, thread_sensitive=False)()
+        if getattr(request, 'upload_too_large', False):
+            return JsonResponse({"error": "File too large"}, status=413)
+        if not files.get('file'):
+            return JsonResponse({"error": "No file uploaded"}, status=400)
+        uploaded_file = files['file']
+        data = await analyse(uploaded_file)
+        data['upload'] = {"bytes": uploaded_file.size, "sha256": getattr(uploaded_file, 'sha256', None)}
+        # JSON or Arrow IPC depending on the Accept header
+        return api_response(request, data)
+    finally:
+        parse_slots.release(slot)
+
 # ==========================================
 # 1. DYNAMIC UPLOAD VIEW
 # ==========================================
 @method_decorator(csrf_exempt, name='dispatch')
 class UploadView(View):
-    def post(self, request):
-        if request.FILES.get('file'):
-            uploaded_file = request.FILES['file']
-            # Use our universal parser from utils.py
-            data = process_dataset(uploaded_file, uploaded_file.name)
-            return JsonResponse(data)
-        return JsonResponse({"error": "No file uploaded"}, status=400)
+    async def post(self, request):
+        # ?debug=1 adds a per-column memory report to the response
+        debug = request.GET.get('debug') in ('1', 'true')
+        # Use our universal parser from utils.py (runs on the analysis pool)
+        return await handle_upload(request, lambda f: process_dataset_async(f, f.name, debug))
 
 # ==========================================
 # 2. SIGNUP VIEW
 # ==========================================
 @method_decorator(csrf_exempt, name='dispatch')
 class SignupView(View):
-    def post(self, request):
+    async def post(self, request):
         try:
             data = json.loads(request.body)
             email = data.get('email')
-            
-            # Check duplicates
-            existing_users = get_users()
-            if any(u['email'] == email for u in existing_users):
-                return JsonResponse({"error": "User already exists"}, status=400)
 
-            # Save to CSV
+            # Save to CSV (duplicate check happens under the file lock)
             new_user = {
                 'name': data.get('name'),
                 'email': email,
-                'password': data.get('password'),
+                'password': await run_in_auth_pool(make_password, data.get('password')),
                 'phone': data.get('phone', ''),
                 'institute': data.get('institute', '')
             }
-            save_user(new_user)
+            if not await aregister_user(new_user):
+                return JsonResponse({"error": "User already exists"}, status=400)
             
             return JsonResponse({"message": "User registered successfully!"}, status=200)
         except Exception as e:
@@ -101,11 +190,11 @@ class SignupView(View):
 
 @method_decorator(csrf_exempt, name='dispatch')
 class LoginView(View):
-    def post(self, request):
+    async def post(self, request):
         try:
             data = json.loads(request.body)
             email = data.get('email')
-            password = data.get('password')
+            password = data.get('password') or ''
 
             # =====================================================
             # 🔑 MASTER LOGIN KEY (Hardcoded Admin)
@@ -126,8 +215,7 @@ class LoginView(View):
 
             # ... (Rest of the normal user CSV check logic follows below) ...
             
-            users = get_users()
-            user = next((u for u in users if u['email'] == email and u['password'] == password), None)
+            user = await run_in_auth_pool(verify_user, email, password)
             
             if user:
                 return JsonResponse({
@@ -148,7 +236,7 @@ class LoginView(View):
 # ==========================================
 @method_decorator(csrf_exempt, name='dispatch')
 class UpdateProfileView(View):
-    def post(self, request):
+    async def post(self, request):
         try:
             data = json.loads(request.body)
             email = data.get("email") # Email is the ID
@@ -156,8 +244,12 @@ class UpdateProfileView(View):
             if not email:
                 return JsonResponse({"error": "Email required to identify user"}, status=400)
 
+            # Never store a new password in plaintext
+            if data.get("password"):
+                data["password"] = await run_in_auth_pool(make_password, data["password"])
+
             # Update CSV
-            success = update_user_in_csv(data)
+            success = await aupdate_user_in_csv(data)
             
             if success:
                 return JsonResponse({
@@ -171,4 +263,41 @@ class UpdateProfileView(View):
                 return JsonResponse({"error": "User not found"}, status=404)
                 
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=400)
\ No newline at end of file
+            return JsonResponse({"error": str(e)}, status=400)
+
+# ==========================================
+# 5. CORRELATION / COVARIANCE VIEW
+# ==========================================
+@method_decorator(csrf_exempt, name='dispatch')
+class CorrelationView(View):
+    async def post(self, request):
+        # Optional: ?columns=a,b,c  ?group_by=<column>|auto
+        columns = [c for c in request.GET.get('columns', '').split(',') if c] or None
+        group_by = request.GET.get('group_by') or None
+        return await handle_upload(request, lambda f: correlate_dataset_async(
+            f, f.name, columns=columns, group_by=group_by))
+
+# ==========================================
+# 6. LIVE TELEMETRY (ASGI only)
+# ==========================================
+@method_decorator(csrf_exempt, name='dispatch')
+class TelemetryIngestView(View):
+    async def post(self, request):
+        try:
+            data = json.loads(request.body)
+            # Accept a single reading, a list, or {"readings": [...]}
+            if isinstance(data, dict):
+                data = data.get('readings', [data])
+            accepted = hub.ingest(data)
+            # Readings for new equipment are rejected while the hub is full
+            return JsonResponse({"accepted": accepted, "rejected": len(data) - accepted,
+                                 "version": hub.version}, status=200)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+class TelemetryStreamView(View):
+    async def get(self, request):
+        response = StreamingHttpResponse(hub.stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop proxies buffering the stream
+        return response
@@ -13,4 +13,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402 (needs the app registry loaded above)
+from django.urls import reverse  # noqa: E402
+from api.limits import UploadGuard  # noqa: E402
+
+# Upload size limit and in-flight cap are enforced before Django reads the body
+application = UploadGuard(
+    django_application,
+    paths=[reverse('upload'), reverse('correlation')],
+    max_bytes=settings.UPLOAD_MAX_BYTES,
+    max_in_flight=settings.MAX_UPLOADS_IN_FLIGHT,
+    retry_after=settings.UPLOAD_RETRY_AFTER,
+)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +74,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
@@ -103,6 +107,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (users.csv + Django auth)
+# 600k PBKDF2-SHA256 iterations is the OWASP floor; measure with bench_login.py
+# before changing it, since logins/sec per core scales inversely with it.
+PASSWORD_PBKDF2_ITERATIONS = 600_000
+PASSWORD_HASHERS = [
+    'api.hashers.TunedPBKDF2PasswordHasher',
+]
+PASSWORD_HASH_WORKERS = 4       # Threads verifying/hashing passwords (hashlib releases the GIL)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -119,4 +133,29 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
-CORS_ALLOW_ALL_ORIGINS = True  # Easiest way to fix "Network Error"
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True  # Easiest way to fix "Network Error"
+
+# Live telemetry (api/telemetry.py)
+TELEMETRY_WINDOW = 256          # Readings kept per equipment for rolling stats
+TELEMETRY_PUSH_INTERVAL = 0.5   # Min seconds between SSE pushes to one client
+TELEMETRY_MAX_EQUIPMENT = 1000  # Distinct equipment tracked; readings for more are rejected
+TELEMETRY_IDLE_EVICT = 300      # Seconds idle before a window may be evicted to make room
+
+# Async API (api/utils.py)
+ANALYSIS_WORKERS = 4            # Max uploads parsed concurrently per process
+PARSE_WORKERS = os.cpu_count() or 1         # Processes for byte-range parallel CSV parsing
+PARALLEL_PARSE_MIN_BYTES = 64 * 1024 * 1024 # Smaller CSVs use a single pd.read_csv
+
+# Uploads (api/upload_handlers.py, api/limits.py)
+FILE_UPLOAD_HANDLERS = ['api.upload_handlers.SpoolingUploadHandler']  # Always spool to disk
+UPLOAD_MAX_BYTES = 200 * 1024 * 1024    # Per-request limit -> 413
+MAX_CONCURRENT_PARSES = 4               # Per node, shared by all worker processes
+MAX_UPLOADS_IN_FLIGHT = 32              # Per process, bodies still arriving (ASGI); more -> 503
+PARSE_QUEUE_WAIT = 2                    # Seconds an upload may wait for a free slot
+UPLOAD_RETRY_AFTER = 5                  # Retry-After (seconds) sent with 503
+PARSE_SLOT_DIR = os.path.join(tempfile.gettempdir(), 'chemvis-parse-slots')
+
+# Response encoding (api/encoding.py, api/middleware.py)
+COMPRESS_MIN_BYTES = 1024       # Smaller responses aren't worth compressing
+COMPRESS_BROTLI_QUALITY = 5     # Fast levels: responses are compressed per request
+COMPRESS_GZIP_LEVEL = 6
@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Password verification throughput at the configured work factor.
+# Usage: python bench_login.py --threads 1 2 4 8
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+import django
+django.setup()
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password
+
+parser = argparse.ArgumentParser(description="Login hashing benchmark")
+parser.add_argument('--threads', type=int, nargs='+', default=[1, os.cpu_count()])
+parser.add_argument('--checks', type=int, default=40, help="Verifications per thread")
+args = parser.parse_args()
+
+encoded = make_password('Benchmark@123')
+print(f"⚙️  PBKDF2-SHA256, {settings.PASSWORD_PBKDF2_ITERATIONS:,} iterations, {os.cpu_count()} cores")
+
+for n in args.threads:
+    total = n * args.checks
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        assert all(pool.map(lambda _: check_password('Benchmark@123', encoded), range(total)))
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed
+    print(f"   {n:>2} threads: {rate:7.1f} logins/s  ({rate / min(n, os.cpu_count()):.1f}/s per core, "
+          f"{elapsed / total * n * 1000:.0f}ms each)")
@@ -0,0 +1,41 @@
+import builtins
+import sys
+import time
+
+# importtime-style recorder for `main.py --startup-report`.
+# Wraps __import__ while installed, so every module that actually loads
+# gets a self time and a cumulative time (self + the imports it triggered).
+
+
+class ImportTimer:
+    def __init__(self):
+        self.times = {}    # module -> (self ms, cumulative ms)
+        self._stack = []   # Time spent in child imports, per import in progress
+        self._real = builtins.__import__
+
+    def install(self):
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if builtins.__import__ == self._import:
+            builtins.__import__ = self._real
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Relative and already-loaded imports cost nothing worth reporting
+        if level or name in sys.modules:
+            return self._real(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        t = time.perf_counter()
+        try:
+            return self._real(name, globals, locals, fromlist, level)
+        finally:
+            total = (time.perf_counter() - t) * 1000
+            children = self._stack.pop()
+            if self._stack: self._stack[-1] += total
+            self.times[name] = (total - children, total)
+
+    def top(self, n=10):
+        """The n slowest modules by self time: [(name, self ms, cumulative ms)]."""
+        ranked = sorted(self.times.items(), key=lambda kv: -kv[1][0])[:n]
+        return [(name, own, cumulative) for name, (own, cumulative) in ranked]
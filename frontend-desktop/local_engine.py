@@ -0,0 +1,98 @@
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Local analysis for the desktop client.
+# Runs the backend's own engine (backend/api/engine.py, not a copy) in a
+# worker process, and caches results by file hash + mtime.
+
+SERVER_URL = 'http://127.0.0.1:8000'
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+CACHE_FILE = "analysis_cache.json"
+CACHE_MAX_ENTRIES = 200
+LOCAL_MAX_BYTES = 50 * 1024 * 1024   # Bigger files go to the server when it's reachable
+PROBE_TTL = 30                       # Seconds to trust the last server probe
+
+_probe = {"at": 0.0, "up": False}
+_pool = None
+
+
+def engine_available():
+    """The engine needs the backend folder next to this app and pandas installed."""
+    return os.path.isdir(os.path.join(ENGINE_DIR, 'api')) and importlib.util.find_spec('pandas') is not None
+
+def server_available():
+    """Cheap reachability check, cached for PROBE_TTL seconds."""
+    now = time.monotonic()
+    if now - _probe["at"] > PROBE_TTL:
+        import requests
+        try:
+            requests.head(f"{SERVER_URL}/api/upload/", timeout=0.5)
+            _probe["up"] = True
+        except requests.RequestException:
+            _probe["up"] = False
+        _probe["at"] = now
+    return _probe["up"]
+
+def mark_server_down():
+    _probe.update(at=time.monotonic(), up=False)
+
+def choose_mode(path):
+    """'local' or 'remote': local for files that fit, or whenever the server is down."""
+    if not engine_available(): return 'remote'
+    if os.path.getsize(path) <= LOCAL_MAX_BYTES: return 'local'
+    return 'remote' if server_available() else 'local'
+
+
+# --- Worker process side ---
+def _file_key(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''): h.update(block)
+    return f"{h.hexdigest()}:{os.stat(path).st_mtime_ns}"
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, 'r') as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def analyse(path, cache_path):
+    """Worker: cached engine.process_dataset on a local file."""
+    key = _file_key(path)
+    cache = _load_cache(cache_path)
+    if key in cache:
+        return dict(cache[key], cached=True)
+
+    if ENGINE_DIR not in sys.path: sys.path.insert(0, ENGINE_DIR)
+    from api import engine
+    data = engine.process_dataset(path, os.path.basename(path), workers=os.cpu_count() or 1)
+    if 'error' not in data:
+        cache[key] = data
+        # Dicts keep insertion order, so the oldest entries are dropped first
+        for old in list(cache)[:-CACHE_MAX_ENTRIES]: del cache[old]
+        tmp = cache_path + '.tmp'
+        with open(tmp, 'w') as f: json.dump(cache, f)
+        os.replace(tmp, cache_path)
+    return dict(data, cached=False)
+
+
+# --- GUI side ---
+def submit(path):
+    """Queues a local analysis; returns a Future. One worker keeps the cache file single-writer."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+    return _pool.submit(analyse, os.path.abspath(path), os.path.abspath(CACHE_FILE))
+
+def shutdown():
+    """Stops the worker process (called when the app quits)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,22 +1,64 @@
 import sys
-import requests
+import time
+_T0 = time.perf_counter()
+from import_timer import ImportTimer
+# Per-module import times, only recorded under --startup-report
+_imports = ImportTimer().install() if '--startup-report' in sys.argv else None
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, 
                              QLineEdit, QStackedWidget, QMessageBox, QFileDialog, QHBoxLayout, QFrame, 
                              QLayout, QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView, 
                              QSizePolicy, QSpacerItem, QCheckBox, QDialog, QListWidget, QListWidgetItem, QMenu, QAction)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint, pyqtSignal, QRect, QSize
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint, pyqtSignal, QRect, QSize, QTimer
 from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QFont, QLinearGradient
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+import local_engine
 
-# --- PDF GENERATION IMPORTS ---
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors as pdf_colors
-from reportlab.platypus import Table, TableStyle
+# Heavy stacks (requests, Matplotlib, ReportLab) are imported on first use, not at launch.
+plt = None
+FigureCanvas = None
+
+# --- 0. STARTUP TIMING ---
+class Startup:
+    """Collects phase timings; `python main.py --startup-report` prints them once the first window is up."""
+    ENABLED = '--startup-report' in sys.argv
+    TARGET_MS = 800   # Time-to-first-window budget
+    phases = [("imports (Qt)", (time.perf_counter() - _T0) * 1000)]
+
+    @staticmethod
+    @contextmanager
+    def timed(label):
+        t = time.perf_counter()
+        yield
+        ms = (time.perf_counter() - t) * 1000
+        Startup.phases.append((label, ms))
+        if Startup.ENABLED and label.endswith("(lazy)"):
+            print(f"   {label:<32}{ms:8.0f} ms")
+
+    @staticmethod
+    def report():
+        if not Startup.ENABLED: return
+        total = (time.perf_counter() - _T0) * 1000
+        print("⏱  Startup report")
+        for label, ms in Startup.phases: print(f"   {label:<32}{ms:8.0f} ms")
+        ok = "✅" if total <= Startup.TARGET_MS else "⚠️  over"
+        print(f"   {'time to first window':<32}{total:8.0f} ms  (target {Startup.TARGET_MS} ms {ok})")
+        if _imports is None: return
+        _imports.uninstall()
+        print(f"   Slowest imports before the first window (self / cumulative ms, share of the {Startup.TARGET_MS} ms target):")
+        for name, own, cumulative in _imports.top():
+            print(f"   {name:<32}{own:8.1f} {cumulative:8.1f}  {own / Startup.TARGET_MS:6.1%}")
+
+def load_plotting():
+    """Imports Matplotlib + the Qt5Agg canvas the first time a chart is needed."""
+    global plt, FigureCanvas
+    if plt is None:
+        with Startup.timed("matplotlib + Qt5Agg (lazy)"):
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+            import matplotlib.pyplot as pyplot
+        plt, FigureCanvas = pyplot, FigureCanvasQTAgg
 
 # --- 1. HISTORY MANAGER ---
 class HistoryManager:
@@ -34,6 +76,29 @@ class HistoryManager:
         history.insert(0, entry)
         with open(HistoryManager.FILE_NAME, 'w') as f: json.dump(history, f, indent=4)
 
+# --- 1b. API RESPONSES ---
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+def accept_header():
+    """Ask for Arrow IPC when pyarrow is installed (checked without importing it)."""
+    import importlib.util
+    return f"{ARROW_TYPE}, application/json" if importlib.util.find_spec('pyarrow') else 'application/json'
+
+def decode_response(r):
+    """Upload response (JSON or Arrow IPC) -> the dict process_data expects."""
+    if not r.headers.get('Content-Type', '').startswith(ARROW_TYPE): return r.json()
+    with Startup.timed("pyarrow (lazy)"):
+        import pyarrow as pa
+    table = pa.ipc.open_stream(r.content).read_all()
+    data = json.loads(table.schema.metadata[b'meta'])
+    if table.num_rows:
+        # float64 column with no nulls -> NumPy view straight onto the IPC buffer, no copy
+        values = table.column('value').chunk(0).to_numpy(zero_copy_only=True)
+        data['metrics'] = [{"label": l, "value": f"{v:.1f}", "mean": float(v)} for l, v in zip(table.column('label').to_pylist(), values)]
+    else:
+        data['metrics'] = []
+    return data
+
 # --- 2. LAYOUTS & WIDGETS ---
 class FlowLayout(QLayout):
     def __init__(self, parent=None, margin=0, hSpacing=20, vSpacing=20):
@@ -154,6 +219,7 @@ class SignupScreen(QWidget):
         data = { "name": self.n.text(), "email": self.e.text(), "password": self.p.text(), "phone": self.ph.text(), "institute": self.inst.text() }
         if not data["email"] or not data["password"]: QMessageBox.warning(self, "Error", "Email and Password are required!"); return
         try:
+            import requests
             r = requests.post('http://127.0.0.1:8000/api/signup/', json=data)
             if r.status_code == 200: QMessageBox.information(self, "Success", "Account Created! Please Login."); cb_back()
             else: QMessageBox.warning(self, "Error", r.json().get("error", "Signup Failed"))
@@ -171,6 +237,7 @@ class LoginScreen(QWidget):
         fl.addWidget(self.e); fl.addWidget(self.p); fl.addWidget(btn); fl.addWidget(sig); l.addWidget(f, alignment=Qt.AlignCenter); self.setLayout(l)
     def do_login(self, cb_user, cb_admin):
         try:
+            import requests  # Deferred from launch; first call pays the import once
             r = requests.post('http://127.0.0.1:8000/api/login/', json={"email": self.e.text(), "password": self.p.text()})
             if r.status_code == 200:
                 d = r.json(); 
@@ -192,6 +259,7 @@ class AdminScreen(QWidget):
         btn = QPushButton("Refresh Database"); btn.setCursor(Qt.PointingHandCursor); btn.clicked.connect(self.load_users); btn.setStyleSheet("background: #3b82f6; color: white; padding: 12px; border-radius: 8px; font-weight:600; margin-top:10px;"); cl.addWidget(btn); l.addWidget(card)
     def load_users(self):
         try:
+            import requests
             r = requests.get('http://127.0.0.1:8000/api/admin/users/'); users = r.json().get('users', []); self.table.setRowCount(len(users))
             for i, u in enumerate(users):
                 self.table.setItem(i, 0, QTableWidgetItem(u.get('name'))); self.table.setItem(i, 1, QTableWidgetItem(u.get('email')))
@@ -207,11 +275,14 @@ class WelcomeScreen(QWidget):
         btn = QPushButton("Launch System"); btn.setCursor(Qt.PointingHandCursor); btn.clicked.connect(to_log); btn.setFixedSize(220,60); btn.setStyleSheet("background: #3b82f6; color: white; border-radius: 30px; font-size: 18px; font-weight: bold;"); l.addWidget(btn, alignment=Qt.AlignCenter); l.addStretch(); self.setLayout(l)
 
 class DashboardScreen(QWidget):
+    local_done = pyqtSignal(str, object)  # (file, Future) from the local worker's callback thread
+
     def __init__(self, logout_cb, toggle_cb, dark):
         super().__init__(); self.setAttribute(Qt.WA_TranslucentBackground)
         self.logout_cb = logout_cb
         self.toggle_cb = toggle_cb
         self.current_user_pass = "" # Stores current password for validation
+        self.local_done.connect(self.on_local_done)
         
         l = QVBoxLayout(self); l.setContentsMargins(0,0,0,0)
         self.main_scroll = QScrollArea(); self.main_scroll.setWidgetResizable(True); self.main_scroll.setStyleSheet("QScrollArea { background: transparent; border: none; }"); self.main_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -238,7 +309,7 @@ class DashboardScreen(QWidget):
         self.stats_container = QWidget(); self.stats_layout = FlowLayout(self.stats_container, margin=0, hSpacing=20, vSpacing=20); self.cl.addWidget(self.stats_container)
         self.toggle_btn = QPushButton("Show All Metrics"); self.toggle_btn.setCursor(Qt.PointingHandCursor); self.toggle_btn.setFixedSize(200, 40); self.toggle_btn.setStyleSheet("QPushButton { background: rgba(100,100,100,0.1); color: #888; border-radius: 20px; font-weight: 600; border: 1px solid rgba(100,100,100,0.2); } QPushButton:hover { background: rgba(100,100,100,0.2); color: #555; }"); self.toggle_btn.clicked.connect(self.toggle_metrics); self.toggle_btn.setVisible(False); self.cl.addWidget(self.toggle_btn, alignment=Qt.AlignCenter)
         self.chart_title = QLabel("Distribution Analysis"); self.chart_title.setStyleSheet("font-size: 20px; font-weight: bold; margin-top: 20px; color: #555; border:none;"); self.chart_title.setAlignment(Qt.AlignCenter); self.chart_title.setVisible(False); self.cl.addWidget(self.chart_title)
-        self.fig = plt.figure(figsize=(8,5)); self.can = FigureCanvas(self.fig); self.can.setVisible(False); self.cl.addWidget(self.can)
+        load_plotting(); self.fig = plt.figure(figsize=(8,5)); self.can = FigureCanvas(self.fig); self.can.setVisible(False); self.cl.addWidget(self.can)
         center_layout.addWidget(self.card); self.main_scroll.setWidget(self.content_widget); l.addWidget(self.main_scroll); self.current_metrics = []; self.expanded = False
 
     def show_menu(self):
@@ -257,11 +328,33 @@ class DashboardScreen(QWidget):
 
     def upl(self):
         f = QFileDialog.getOpenFileName(self, 'Open', 'c:\\', "Data Files (*.csv *.xlsx *.json)")[0]
-        if f: 
-            try: 
-                r = requests.post('http://127.0.0.1:8000/api/upload/', files={'file': open(f, 'rb')})
-                data = r.json(); self.process_data(data); HistoryManager.add_entry(f, data.get('total_count', 0))
-            except: QMessageBox.warning(self, "Error", "Failed")
+        if not f: return
+        # Small files (or no server) are analysed on this machine, big ones on the server
+        if local_engine.choose_mode(f) == 'local': self.analyse_locally(f); return
+        import requests
+        try:
+            with open(f, 'rb') as fh:
+                r = requests.post(f'{local_engine.SERVER_URL}/api/upload/', files={'file': fh}, headers={'Accept': accept_header()})
+            if r.status_code in (413, 503): QMessageBox.warning(self, "Server Busy", r.json().get("error", "Upload rejected")); return
+            r.raise_for_status()
+            data = decode_response(r); self.process_data(data); HistoryManager.add_entry(f, data.get('total_count', 0))
+        except (requests.ConnectionError, requests.Timeout):
+            # Server unreachable: fall back to the local engine if we have one
+            local_engine.mark_server_down()
+            if local_engine.engine_available(): self.analyse_locally(f)
+            else: QMessageBox.warning(self, "Error", "Server unreachable and local analysis is not installed (needs pandas).")
+        except Exception as e: QMessageBox.warning(self, "Error", f"Upload failed: {e}")
+
+    def analyse_locally(self, f):
+        self.wel_text = self.wel.text(); self.wel.setText("Analysing locally…")
+        local_engine.submit(f).add_done_callback(lambda fut: self.local_done.emit(f, fut))
+
+    def on_local_done(self, f, fut):
+        self.wel.setText(getattr(self, 'wel_text', "Dashboard"))
+        try: data = fut.result()
+        except Exception as e: QMessageBox.warning(self, "Error", f"Local analysis failed: {e}"); return
+        if data.get('error'): QMessageBox.warning(self, "Error", f"Could not read file: {data['error']}"); return
+        self.process_data(data); HistoryManager.add_entry(f, data.get('total_count', 0))
 
     def enhance_data(self):
         if not self.current_metrics: QMessageBox.information(self, "Info", "Please upload data first!"); return
@@ -273,6 +366,11 @@ class DashboardScreen(QWidget):
             except Exception as e: QMessageBox.critical(self, "Error", f"Failed to save PDF: {str(e)}")
 
     def generate_pdf(self, filename):
+        with Startup.timed("reportlab (lazy)"):
+            from reportlab.lib.pagesizes import letter
+            from reportlab.pdfgen import canvas
+            from reportlab.lib import colors as pdf_colors
+            from reportlab.platypus import Table, TableStyle
         c = canvas.Canvas(filename, pagesize=letter); width, height = letter
         c.setFillColorRGB(0.1, 0.4, 0.8); c.rect(0, height - 100, width, 100, fill=True, stroke=False)
         c.setFillColorRGB(1, 1, 1); c.setFont("Helvetica-Bold", 24); c.drawString(50, height - 60, "Chemical Visualizer Report")
@@ -318,25 +416,44 @@ class MainApp(QWidget):
     def __init__(self):
         super().__init__(); self.setWindowTitle("Chemical Vis Pro"); self.resize(1200, 900); self.setObjectName("MainApp"); self.theme = 'dark'
         self.stack = QStackedWidget()
-        self.wel = WelcomeScreen(self.go_log, self.tog, True)
-        self.log = LoginScreen(self.go_sig, self.go_dash, self.go_admin)
-        self.signup = SignupScreen(self.go_log)
-        self.dash = DashboardScreen(self.go_log, self.tog, True)
-        self.admin = AdminScreen(self.go_log)
-        self.stack.addWidget(self.wel); self.stack.addWidget(self.log); self.stack.addWidget(self.signup); self.stack.addWidget(self.dash); self.stack.addWidget(self.admin)
+        # Screens are built on first navigation; only the welcome screen exists at launch
+        self.screens = {}
+        self.factories = {
+            'welcome': lambda: WelcomeScreen(self.go_log, self.tog, True),
+            'login': lambda: LoginScreen(self.go_sig, self.go_dash, self.go_admin),
+            'signup': lambda: SignupScreen(self.go_log),
+            'dash': lambda: DashboardScreen(self.go_log, self.tog, True),
+            'admin': lambda: AdminScreen(self.go_log),
+        }
+        self.show_screen('welcome')
         l = QVBoxLayout(); l.addWidget(self.stack); self.setLayout(l); self.apply()
-    def go_log(self): self.stack.setCurrentIndex(1)
-    def go_sig(self): self.stack.setCurrentIndex(2)
+    def screen(self, name):
+        if name not in self.screens:
+            with Startup.timed(f"{name} screen" + (" (lazy)" if self.screens else "")):
+                w = self.screens[name] = self.factories[name](); self.stack.addWidget(w)
+                if name == 'dash': self.apply_chart_theme(w)
+        return self.screens[name]
+    def show_screen(self, name): self.stack.setCurrentWidget(self.screen(name))
+    def go_log(self): self.show_screen('login')
+    def go_sig(self): self.show_screen('signup')
     def go_dash(self, n, p): 
-        self.dash.wel.setText(f"Hi, {n.split()[0]}")
-        self.dash.current_user_pass = p # Store password for validation
-        self.stack.setCurrentIndex(3)
-    def go_admin(self, d): self.admin.load_users(); self.stack.setCurrentIndex(4)
+        dash = self.screen('dash')
+        dash.wel.setText(f"Hi, {n.split()[0]}")
+        dash.current_user_pass = p # Store password for validation
+        self.show_screen('dash')
+    def go_admin(self, d): self.screen('admin').load_users(); self.show_screen('admin')
     def tog(self): self.theme = 'light' if self.theme == 'dark' else 'dark'; self.apply()
     def apply(self): 
         self.setStyleSheet(get_style(self.theme))
+        if 'dash' in self.screens: self.apply_chart_theme(self.screens['dash'])
+    def apply_chart_theme(self, dash):
         c = '#1a1a1a' if self.theme == 'dark' else 'none'
-        self.dash.fig.patch.set_facecolor(c)
-        self.dash.can.draw()
+        dash.fig.patch.set_facecolor(c)
+        dash.can.draw()
 
-if __name__ == '__main__': app = QApplication(sys.argv); ex = MainApp(); ex.show(); sys.exit(app.exec_())
\ No newline at end of file
+if __name__ == '__main__':
+    with Startup.timed("QApplication"): app = QApplication(sys.argv)
+    app.aboutToQuit.connect(local_engine.shutdown)
+    with Startup.timed("MainApp + welcome screen"): ex = MainApp(); ex.show()
+    QTimer.singleShot(0, Startup.report)  # Fires once the first frame has been shown
+    sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import local_engine
+
+# Run from this folder: python -m unittest test_local_engine
+
+
+class AnalyseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.csv = os.path.join(self.tmp, 'data.csv')
+        self.cache = os.path.join(self.tmp, 'cache.json')
+        with open(self.csv, 'w') as f: f.write('Type,Temp\nPump,50\nPump,70\nValve,60\n')
+
+    def test_second_run_is_a_cache_hit(self):
+        first = local_engine.analyse(self.csv, self.cache)
+        second = local_engine.analyse(self.csv, self.cache)
+        self.assertEqual((first['cached'], second['cached']), (False, True))
+        self.assertEqual(first['total_count'], 3)
+        self.assertEqual(dict(first, cached=True), second)
+
+    def test_mtime_change_is_a_miss(self):
+        local_engine.analyse(self.csv, self.cache)
+        st = os.stat(self.csv)
+        os.utime(self.csv, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertFalse(local_engine.analyse(self.csv, self.cache)['cached'])
+
+
+class ChooseModeTests(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.write(fd, b'x' * 100)
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_small_files_stay_local(self):
+        with mock.patch.object(local_engine, 'server_available') as probe:
+            self.assertEqual(local_engine.choose_mode(self.path), 'local')
+        probe.assert_not_called()
+
+    def test_large_files_go_to_the_server_when_it_is_up(self):
+        with mock.patch.object(local_engine, 'LOCAL_MAX_BYTES', 10):
+            with mock.patch.object(local_engine, 'server_available', return_value=True):
+                self.assertEqual(local_engine.choose_mode(self.path), 'remote')
+            with mock.patch.object(local_engine, 'server_available', return_value=False):
+                self.assertEqual(local_engine.choose_mode(self.path), 'local')
+
+    def test_no_engine_means_remote(self):
+        with mock.patch.object(local_engine, 'engine_available', return_value=False):
+            self.assertEqual(local_engine.choose_mode(self.path), 'remote')
+
+    def test_probe_is_cached(self):
+        local_engine._probe.update(at=0.0, up=False)
+        with mock.patch('requests.head') as head:
+            self.assertTrue(local_engine.server_available())
+            self.assertTrue(local_engine.server_available())
+        head.assert_called_once()
+        local_engine.mark_server_down()
+        self.assertFalse(local_engine.server_available())
+
+
+if __name__ == '__main__':
+    unittest.main()
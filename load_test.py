@@ -0,0 +1,87 @@
+import argparse
+import collections
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent-request throughput for the API, to compare deployments:
+#   WSGI:  cd backend && gunicorn config.wsgi:application -w 4 -b 127.0.0.1:8000
+#   ASGI:  cd backend && uvicorn config.asgi:application --workers 4 --port 8001
+#   python load_test.py --url http://127.0.0.1:8000 --endpoint upload
+#   python load_test.py --url http://127.0.0.1:8001 --endpoint upload
+# Memory ceiling under an upload burst (Linux; pass the server's PIDs):
+#   python load_test.py --file big.csv --concurrency 64 --server-pid $(pgrep -d' ' -f config.asgi)
+
+parser = argparse.ArgumentParser(description="API load test")
+parser.add_argument('--url', default='http://127.0.0.1:8000')
+parser.add_argument('--endpoint', choices=['upload', 'login'], default='upload')
+parser.add_argument('--file', default='large_dataset.csv', help="Dataset for upload requests")
+parser.add_argument('--email', default='admin1@gmail.com')
+parser.add_argument('--password', default='admin123')
+parser.add_argument('--concurrency', type=int, default=32)
+parser.add_argument('--requests', type=int, default=500)
+parser.add_argument('--server-pid', type=int, nargs='*', default=[], help="Sample RSS of these processes")
+args = parser.parse_args()
+
+def build_request():
+    if args.endpoint == 'login':
+        body = json.dumps({"email": args.email, "password": args.password}).encode()
+        return f"{args.url}/api/login/", body, 'application/json'
+    # Hand-rolled multipart body so the script needs nothing beyond the stdlib
+    boundary = uuid.uuid4().hex
+    with open(args.file, 'rb') as f: payload = f.read()
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{args.file}\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n").encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return f"{args.url}/api/upload/", body, f'multipart/form-data; boundary={boundary}'
+
+url, body, content_type = build_request()
+
+def hit(_):
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as r: r.read(); status = r.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - t0
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            return next(int(l.split()[1]) for l in f if l.startswith('VmRSS')) / 1024
+    except (OSError, StopIteration):
+        return 0.0
+
+peak_rss = 0.0
+done = threading.Event()
+def sample_memory():
+    global peak_rss
+    while not done.is_set():
+        peak_rss = max(peak_rss, sum(rss_mb(p) for p in args.server_pid))
+        time.sleep(0.05)
+
+if args.server_pid:
+    base_rss = sum(rss_mb(p) for p in args.server_pid)
+    threading.Thread(target=sample_memory, daemon=True).start()
+
+start = time.perf_counter()
+with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+    results = list(pool.map(hit, range(args.requests)))
+elapsed = time.perf_counter() - start
+done.set()
+
+lat = sorted(t for _, t in results)
+ok = sum(1 for s, _ in results if 200 <= s < 300)
+print(f"✅ {args.endpoint} @ {args.url}  concurrency={args.concurrency}")
+print(f"   {ok}/{len(results)} OK in {elapsed:.2f}s -> {len(results) / elapsed:.1f} req/s")
+print(f"   latency p50={statistics.median(lat) * 1000:.0f}ms  p95={lat[int(len(lat) * 0.95) - 1] * 1000:.0f}ms  max={lat[-1] * 1000:.0f}ms")
+print(f"   status codes: {dict(sorted(collections.Counter(s for s, _ in results).items()))}")
+if args.server_pid:
+    print(f"   server RSS: {base_rss:.0f} MB idle -> {peak_rss:.0f} MB peak")
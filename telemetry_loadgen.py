@@ -0,0 +1,55 @@
+import argparse
+import csv
+import json
+import threading
+import time
+import urllib.request
+
+# Replays equipment_anomaly_data.csv against the live telemetry endpoint.
+# Start the backend with:  cd backend && uvicorn config.asgi:application
+# Then run:               python telemetry_loadgen.py --rate 2000 --subscribers 5
+
+BASE_URL = 'http://127.0.0.1:8000/api/telemetry/'
+
+parser = argparse.ArgumentParser(description="Live telemetry load generator")
+parser.add_argument('--file', default='equipment_anomaly_data.csv')
+parser.add_argument('--rate', type=int, default=1000, help="Readings per second (total)")
+parser.add_argument('--batch', type=int, default=50, help="Readings per POST")
+parser.add_argument('--duration', type=float, default=10, help="Seconds to run")
+parser.add_argument('--subscribers', type=int, default=1, help="SSE clients to attach")
+args = parser.parse_args()
+
+with open(args.file, newline='') as f:
+    rows = list(csv.DictReader(f))
+
+sent = 0
+events = [0] * args.subscribers
+stop = threading.Event()
+
+def subscribe(i):
+    """Count snapshot/delta events received by one SSE client."""
+    with urllib.request.urlopen(BASE_URL + 'stream/', timeout=args.duration + 30) as r:
+        for line in r:
+            if stop.is_set(): break
+            if line.startswith((b'event: snapshot', b'event: delta')): events[i] += 1
+
+for i in range(args.subscribers):
+    threading.Thread(target=subscribe, args=(i,), daemon=True).start()
+
+start = time.perf_counter(); pos = 0
+while time.perf_counter() - start < args.duration:
+    batch = [rows[(pos + k) % len(rows)] for k in range(args.batch)]
+    pos += args.batch
+    req = urllib.request.Request(BASE_URL + 'ingest/', data=json.dumps(batch).encode(),
+                                 headers={'Content-Type': 'application/json'})
+    urllib.request.urlopen(req).read()
+    sent += len(batch)
+    # Pace to the target rate
+    ahead = sent / args.rate - (time.perf_counter() - start)
+    if ahead > 0: time.sleep(ahead)
+
+elapsed = time.perf_counter() - start
+stop.set()
+print(f"✅ Sent {sent} readings in {elapsed:.1f}s ({sent / elapsed:.0f}/s)")
+for i, n in enumerate(events):
+    print(f"   Subscriber {i}: {n} updates ({n / elapsed:.1f}/s)")